@@ -0,0 +1,114 @@
+"""
+요청 단위 분석 컨텍스트
+수익률, RSI, 이동 창 등 파생 시계열을 이름과 파라미터로 한 번만 계산해 공유합니다.
+파생 시계열은 서로를 참조할 수 있으며(작은 DAG), 계산 시간은 timings에 기록됩니다.
+"""
+import time
+
+import pandas as pd
+
+import indicator_engine
+from indicator_engine import as_float_array
+
+# 이름 → 계산 함수(context, *params)
+DERIVED_SERIES = {}
+
+
+def derived(name):
+    """파생 시계열 계산 함수 등록 데코레이터"""
+    def register(fn):
+        DERIVED_SERIES[name] = fn
+        return fn
+    return register
+
+
+class AnalysisContext:
+    """OHLCV 한 벌에 대한 파생 시계열 메모이제이션"""
+
+    def __init__(self, data):
+        self.data = data
+        self.timings = {}  # 시계열 이름 → 계산 시간 (ms, 의존 계산 포함)
+        self._values = {}
+        self._tails = {}
+
+    def get(self, name, *params):
+        """파생 시계열을 반환 (처음 요청될 때만 계산)"""
+        key = (name, *params)
+        if key not in self._values:
+            started = time.perf_counter()
+            self._values[key] = DERIVED_SERIES[name](self, *params)
+            self.timings[_label(key)] = (time.perf_counter() - started) * 1000
+        return self._values[key]
+
+    def put(self, name, *params, value):
+        """다른 경로(일괄 계산 등)에서 이미 구한 값을 등록"""
+        self._values[(name, *params)] = value
+
+    def tail(self, rows):
+        """최근 rows개 봉에 대한 하위 컨텍스트 (같은 길이는 재사용)"""
+        if rows not in self._tails:
+            self._tails[rows] = AnalysisContext(self.data.tail(rows))
+        return self._tails[rows]
+
+    @property
+    def returns(self):
+        return self.get('returns')
+
+    def all_timings(self):
+        """하위 컨텍스트를 포함한 계산 시간 목록"""
+        timings = dict(self.timings)
+        for rows, context in self._tails.items():
+            for label, elapsed in context.all_timings().items():
+                timings[f"tail{rows}.{label}"] = elapsed
+        return timings
+
+    def format_timings(self):
+        return ', '.join(f"{label}={elapsed:.2f}ms" for label, elapsed in self.all_timings().items())
+
+
+def _label(key):
+    name, *params = key
+    return f"{name}({','.join(str(p) for p in params)})" if params else name
+
+
+# --- 파생 시계열 정의 ---
+@derived('array')
+def _array(context, column):
+    return as_float_array(context.data[column])
+
+
+@derived('returns')
+def _returns(context):
+    return context.data['Close'].pct_change()
+
+
+@derived('rsi')
+def _rsi(context, length):
+    return pd.Series(indicator_engine.rsi(context.get('array', 'Close'), length), index=context.data.index)
+
+
+@derived('macd')
+def _macd(context, fast, slow, signal):
+    index = context.data.index
+    return tuple(
+        pd.Series(values, index=index)
+        for values in indicator_engine.macd(context.get('array', 'Close'), fast, slow, signal)
+    )
+
+
+@derived('bbands')
+def _bbands(context, length, std):
+    index = context.data.index
+    return tuple(
+        pd.Series(values, index=index)
+        for values in indicator_engine.bbands(context.get('array', 'Close'), length, std)
+    )
+
+
+@derived('vwap')
+def _vwap(context, period):
+    vwap = indicator_engine.vwap(
+        context.get('array', 'High'), context.get('array', 'Low'),
+        context.get('array', 'Close'), context.get('array', 'Volume'), period
+    )
+    return pd.Series(vwap, index=context.data.index)
@@ -0,0 +1,230 @@
+"""
+백테스트 파라미터 스윕
+지표 파라미터 조합(그리드)을 (조합 × 봉) 2차원 배열로 한 번에 평가해
+성과 곡면과 최적 조합을 구합니다. 조합이 많으면 여러 프로세스로 나눠 계산할 수 있습니다.
+신호 규칙과 통계는 server.py의 backtest_*_signals와 동일합니다.
+"""
+import itertools
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import indicator_engine
+
+# 지표별 기본 그리드 (축 순서 = 결과 곡면의 차원 순서)
+SWEEP_GRIDS = {
+    'rsi': {'length': [14], 'upper': [65, 70, 75, 80], 'lower': [20, 25, 30, 35]},
+    'bollinger': {'period': [15, 20, 25, 30], 'std_dev': [1.8, 2.0, 2.2, 2.5]},
+    'macd': {'fast': [8, 12], 'slow': [21, 26], 'signal': [7, 9]},
+    'vwap': {'period': [10, 20, 30]},
+}
+INTEGER_PARAMS = {'length', 'period', 'fast', 'slow', 'signal'}
+SWEEP_METRICS = ['avg_return', 'win_rate']
+
+# 프로세스당 최소 조합 수 (이보다 적으면 나누지 않음)
+MIN_COMBINATIONS_PER_WORKER = 16
+# 한 번에 평가할 최대 조합 수 (조합 × 봉 배열의 메모리 상한)
+MAX_BLOCK_ROWS = 256
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def parse_grid(indicator, args):
+    """
+    쿼리 파라미터(쉼표 구분 목록)로 기본 그리드를 덮어씁니다.
+    예: upper=70,75&lower=25,30
+    """
+    if indicator not in SWEEP_GRIDS:
+        raise ValueError(f"지원하지 않는 지표입니다. 허용된 값: {', '.join(SWEEP_GRIDS)}")
+    grid = {}
+    for name, default in SWEEP_GRIDS[indicator].items():
+        raw = args.get(name)
+        if not raw:
+            grid[name] = list(default)
+            continue
+        try:
+            values = [float(v) for v in raw.split(',') if v.strip()]
+        except ValueError:
+            raise ValueError(f"{name} 값은 쉼표로 구분된 숫자여야 합니다")
+        if not values:
+            raise ValueError(f"{name} 값이 비어 있습니다")
+        if name in INTEGER_PARAMS:
+            if any(v < 1 or v != int(v) for v in values):
+                raise ValueError(f"{name} 값은 1 이상의 정수여야 합니다")
+            values = [int(v) for v in values]
+        grid[name] = sorted(set(values))
+    return grid
+
+
+def grid_combinations(indicator, grid):
+    """그리드의 유효한 조합 목록 (MACD는 fast < slow, RSI는 lower < upper만)"""
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if indicator == 'macd':
+        combos = [c for c in combos if c['fast'] < c['slow']]
+    if indicator == 'rsi':
+        combos = [c for c in combos if c['lower'] < c['upper']]
+    return combos
+
+
+# --- 2차원 신호 마스크 (조합 × 봉) ---
+def _rsi_masks(arrays, combos):
+    rsi_by_length = {
+        length: indicator_engine.rsi(arrays['close'], length)
+        for length in {c['length'] for c in combos}
+    }
+    rsi = np.stack([rsi_by_length[c['length']] for c in combos])
+    upper = np.array([c['upper'] for c in combos], dtype=np.float64)[:, None]
+    lower = np.array([c['lower'] for c in combos], dtype=np.float64)[:, None]
+    sell = rsi > upper
+    buy = (rsi < lower) & ~sell
+    return buy, sell
+
+
+def _macd_masks(arrays, combos):
+    close = arrays['close']
+    ema_by_span = {
+        span: indicator_engine.ema(close, span)
+        for span in {c['fast'] for c in combos} | {c['slow'] for c in combos}
+    }
+    macd_line = np.stack([ema_by_span[c['fast']] - ema_by_span[c['slow']] for c in combos])
+    signal_line = np.stack([indicator_engine.ema(row, c['signal']) for row, c in zip(macd_line, combos)])
+    golden_cross = np.zeros(macd_line.shape, dtype=bool)
+    dead_cross = np.zeros(macd_line.shape, dtype=bool)
+    golden_cross[:, 1:] = (macd_line[:, :-1] <= signal_line[:, :-1]) & (macd_line[:, 1:] > signal_line[:, 1:])
+    dead_cross[:, 1:] = (macd_line[:, :-1] >= signal_line[:, :-1]) & (macd_line[:, 1:] < signal_line[:, 1:])
+    return golden_cross, dead_cross
+
+
+def _bollinger_masks(arrays, combos):
+    close = arrays['close']
+    windows = {
+        period: (indicator_engine.rolling_mean(close, period), indicator_engine.rolling_std(close, period))
+        for period in {c['period'] for c in combos}
+    }
+    middle = np.stack([windows[c['period']][0] for c in combos])
+    deviation = np.stack([windows[c['period']][1] for c in combos])
+    deviation *= np.array([c['std_dev'] for c in combos], dtype=np.float64)[:, None]
+    upper, lower = middle + deviation, middle - deviation
+    valid = ~np.isnan(upper) & ~np.isnan(lower)
+    buy = valid & ((close > upper) | (close < lower))
+    return buy, np.zeros_like(buy)
+
+
+def _vwap_masks(arrays, combos):
+    close = arrays['close']
+    vwap_by_period = {
+        period: indicator_engine.vwap(arrays['high'], arrays['low'], close, arrays['volume'], period)
+        for period in {c['period'] for c in combos}
+    }
+    vwap = np.stack([vwap_by_period[c['period']] for c in combos])
+    return close > vwap, close < vwap
+
+
+SIGNAL_MASKS = {
+    'rsi': _rsi_masks,
+    'macd': _macd_masks,
+    'bollinger': _bollinger_masks,
+    'vwap': _vwap_masks,
+}
+
+
+def evaluate_combinations(indicator, arrays, combos, holding_period, start):
+    """
+    조합별 (신호 수, 수익 신호 수, 수익률 합) 배열
+    신호 봉에서 holding_period 봉 후까지의 수익률을 행 단위로 합산합니다.
+    """
+    close = arrays['close']
+    end = len(close) - holding_period
+    if end <= start or not combos:
+        zeros = np.zeros(len(combos))
+        return zeros.astype(np.int64), zeros.astype(np.int64), zeros
+
+    longs, shorts = SIGNAL_MASKS[indicator](arrays, combos)
+    longs, shorts = longs[:, start:end], shorts[:, start:end] & ~longs[:, start:end]
+    price = close[start:end]
+    forward = (close[start + holding_period:] - price) / price
+
+    signals = longs | shorts
+    returns = np.where(longs, forward, -forward)
+    counts = signals.sum(axis=1)
+    wins = (signals & (returns > 0)).sum(axis=1)
+    sums = np.where(signals, returns, 0.0).sum(axis=1)
+    return counts, wins, sums
+
+
+def _evaluate_chunk(task):
+    """프로세스 풀 작업 단위 (피클 가능한 모듈 수준 함수)"""
+    return evaluate_combinations(*task)
+
+
+def _get_process_pool(workers):
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+        return _process_pool
+
+
+def run_sweep(arrays, indicator, grid, holding_period, start, metric='avg_return', min_signals=5, workers=1):
+    """
+    그리드 전체를 평가해 성과 곡면과 최적 조합을 반환합니다.
+    arrays: close/high/low/volume float64 배열
+    workers: 2 이상이면 조합을 나눠 여러 프로세스에서 계산
+    """
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"지원하지 않는 평가 기준입니다. 허용된 값: {', '.join(SWEEP_METRICS)}")
+    combos = grid_combinations(indicator, grid)
+
+    chunks = max(1, min(workers, len(combos) // MIN_COMBINATIONS_PER_WORKER))
+    size = max(1, min(MAX_BLOCK_ROWS, math.ceil(len(combos) / chunks)))
+    tasks = [
+        (indicator, arrays, combos[i:i + size], holding_period, start)
+        for i in range(0, len(combos), size)
+    ]
+    if chunks >= 2:
+        parts = list(_get_process_pool(workers).map(_evaluate_chunk, tasks))
+    else:
+        parts = [_evaluate_chunk(task) for task in tasks]
+    counts, wins, sums = (
+        np.concatenate([part[i] for part in parts]) if parts else np.zeros(0)
+        for i in range(3)
+    )
+
+    surface = [
+        {'params': combo, **_summarize(int(count), int(win), float(total))}
+        for combo, count, win, total in zip(combos, counts, wins, sums)
+    ]
+    candidates = [
+        row for row in surface
+        if row['total_signals'] >= min_signals and row[metric] is not None
+    ]
+    best = max(candidates, key=lambda row: (row[metric], row['total_signals'])) if candidates else None
+
+    return {
+        'indicator': indicator,
+        'holding_period': holding_period,
+        'metric': metric,
+        'min_signals': min_signals,
+        'axes': grid,
+        'combinations': len(combos),
+        'surface': surface,
+        'best': best,
+    }
+
+
+def _summarize(count, wins, total):
+    """backtest_*_signals와 같은 통계 (NaN 수익률은 None)"""
+    if count == 0:
+        return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
+    accuracy = round(wins / count * 100, 1)
+    avg_return = total / count * 100
+    return {
+        'accuracy': accuracy,
+        'avg_return': round(avg_return, 2) if math.isfinite(avg_return) else None,
+        'total_signals': count,
+        'win_rate': accuracy,
+    }
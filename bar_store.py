@@ -0,0 +1,232 @@
+"""
+OHLCV 바 저장소
+티커/간격별 시계열을 디스크에 컬럼 단위(npz)로 보관하고,
+마지막 저장 시점 이후의 구간만 증분으로 가져옵니다.
+분할/배당으로 과거 수정주가가 바뀐 경우에만 전체 구간을 다시 받습니다.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# 기간별 시작 시점 (yfinance period 기준)
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# 거래일 수 기준 기간 (주말/연휴를 넉넉히 감안한 달력 일수)
+SESSION_PERIODS = {'1d': (1, 7), '5d': (5, 14)}
+
+# 수정주가 변경을 유발하는 이벤트 컬럼
+ADJUSTMENT_COLUMNS = ['Dividends', 'Stock Splits']
+
+# 겹치는 봉의 종가 비교 허용 오차 (상대값)
+ADJUSTMENT_TOLERANCE = 1e-6
+
+
+def yfinance_history(ticker, **kwargs):
+    """기본 데이터 공급자: yfinance history"""
+    return yf.Ticker(ticker).history(**kwargs)
+
+
+def period_start(period, now):
+    """요청 기간이 필요로 하는 가장 이른 시점 (max는 None)"""
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return now.normalize().replace(month=1, day=1)
+    if period in SESSION_PERIODS:
+        return now - pd.Timedelta(days=SESSION_PERIODS[period][1])
+    return now - PERIOD_OFFSETS[period]
+
+
+def slice_period(frame, period):
+    """저장된 시계열에서 요청 기간만큼 잘라냅니다."""
+    if frame.empty or period == 'max':
+        return frame
+    if period in SESSION_PERIODS:
+        # 최근 N 거래일 (일봉은 N개 봉, 분봉은 N개 세션)
+        sessions = frame.index.normalize()
+        keep = sessions.unique()[-SESSION_PERIODS[period][0]:]
+        return frame[sessions.isin(keep)]
+    now = pd.Timestamp.now(tz=frame.index.tz)
+    return frame[frame.index >= period_start(period, now)]
+
+
+class BarStore:
+    """티커/간격별 OHLCV 증분 저장소"""
+
+    def __init__(self, root_dir, intervals=('1d', '1wk', '1mo'), min_refresh=60, fetch=yfinance_history):
+        self.root_dir = root_dir
+        self.intervals = set(intervals)
+        self.min_refresh = min_refresh
+        self.fetch = fetch
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # --- 공개 API ---
+    def get_history(self, ticker, period, interval, timeout=30):
+        """
+        요청 기간의 OHLCV를 반환합니다.
+        저장본이 기간을 포함하면 마지막 봉 이후만 공급자에게 요청합니다.
+        """
+        if interval not in self.intervals:
+            return self.fetch(ticker, period=period, interval=interval, timeout=timeout)
+
+        with self._lock_for(ticker, interval):
+            frame, meta = self._load(ticker, interval)
+            now = pd.Timestamp.now(tz='UTC')
+
+            if frame is None or not self._covers(meta, period, now):
+                return self._full_fetch(ticker, period, interval, timeout, now)
+
+            if time.time() - meta['fetched_at'] >= self.min_refresh:
+                frame = self._refresh_tail(ticker, interval, frame, meta, timeout, now)
+
+            return slice_period(frame, period)
+
+    def stored(self, ticker, interval):
+        """공급자 요청 없이 저장된 시계열만 반환 (없으면 None)"""
+        with self._lock_for(ticker, interval):
+            frame, _ = self._load(ticker, interval)
+        return frame
+
+    def invalidate(self, ticker, interval):
+        """저장본을 삭제합니다."""
+        with self._lock_for(ticker, interval):
+            path = self._path(ticker, interval)
+            if os.path.exists(path):
+                os.remove(path)
+
+    # --- 증분 갱신 ---
+    def _full_fetch(self, ticker, period, interval, timeout, now):
+        frame = self.fetch(ticker, period=period, interval=interval, timeout=timeout)
+        if not frame.empty:
+            start = period_start(period, now)
+            self._save(ticker, interval, frame, {
+                'period': period,
+                'coverage_start': None if start is None else start.isoformat(),
+            })
+        return frame
+
+    def _refresh_tail(self, ticker, interval, frame, meta, timeout, now):
+        # 마지막 봉은 진행 중일 수 있으므로 직전 완성 봉부터 겹쳐서 받습니다.
+        overlap_start = frame.index[-2] if len(frame) >= 2 else frame.index[-1]
+        try:
+            delta = self.fetch(ticker, start=overlap_start, interval=interval, timeout=timeout)
+        except Exception as e:
+            # 공급자 장애 시 저장된 데이터로 응답 (다음 요청에서 다시 시도)
+            logging.warning(f"Tail refresh failed for {ticker} ({interval}), serving stored bars: {e}")
+            return frame
+
+        if delta.empty:
+            self._save(ticker, interval, frame, meta)
+            return frame
+
+        if self._adjustment_detected(frame, delta):
+            logging.info(f"Price adjustment detected for {ticker} ({interval}); re-downloading {meta['period']}")
+            return self._full_fetch(ticker, meta['period'], interval, timeout, now)
+
+        delta = delta.reindex(columns=frame.columns)
+        merged = pd.concat([frame[frame.index < delta.index[0]], delta])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        self._save(ticker, interval, merged, meta)
+        return merged
+
+    @staticmethod
+    def _adjustment_detected(frame, delta):
+        """겹치는 봉의 종가가 달라졌거나 새 분할/배당 이벤트가 있으면 True"""
+        common = frame.index.intersection(delta.index)
+        if len(common) > 0:
+            # 진행 중인 마지막 봉은 비교에서 제외
+            completed = common[common < frame.index[-1]] if len(common) > 1 else common[:0]
+            if len(completed) > 0:
+                stored = frame.loc[completed, 'Close'].to_numpy(dtype=np.float64)
+                fresh = delta.loc[completed, 'Close'].to_numpy(dtype=np.float64)
+                if not np.allclose(stored, fresh, rtol=ADJUSTMENT_TOLERANCE, atol=0, equal_nan=True):
+                    return True
+
+        for column in ADJUSTMENT_COLUMNS:
+            if column not in delta.columns:
+                continue
+            events = delta[column].fillna(0)
+            if column in frame.columns:
+                known = frame[column].reindex(events.index).fillna(0)
+                events = events[events != known]
+            if (events != 0).any():
+                return True
+        return False
+
+    @staticmethod
+    def _covers(meta, period, now):
+        if meta.get('period') == 'max':
+            return True
+        if period == 'max' or meta.get('coverage_start') is None:
+            return False
+        return pd.Timestamp(meta['coverage_start']) <= period_start(period, now)
+
+    # --- 파일 입출력 ---
+    def _lock_for(self, ticker, interval):
+        key = (ticker, interval)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _path(self, ticker, interval):
+        safe_ticker = re.sub(r'[^A-Za-z0-9.\-^=]', '_', ticker)
+        return os.path.join(self.root_dir, f"{safe_ticker}_{interval}.npz")
+
+    def _load(self, ticker, interval):
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                meta = json.loads(str(stored['meta']))
+                index = pd.DatetimeIndex(stored['index'])
+                if meta.get('tz'):
+                    index = index.tz_localize('UTC').tz_convert(meta['tz'])
+                index.name = meta.get('index_name')
+                columns = {name: stored[f'c{i}'] for i, name in enumerate(meta['columns'])}
+            return pd.DataFrame(columns, index=index), meta
+        except Exception as e:
+            logging.warning(f"Bar store read failed for {ticker} ({interval}): {e}")
+            return None, None
+
+    def _save(self, ticker, interval, frame, meta):
+        os.makedirs(self.root_dir, exist_ok=True)
+        index = frame.index
+        meta = dict(meta)
+        meta['fetched_at'] = time.time()
+        meta['tz'] = str(index.tz) if index.tz is not None else None
+        meta['columns'] = list(frame.columns)
+        meta['index_name'] = index.name
+        meta['last_timestamp'] = index[-1].isoformat()
+
+        naive_index = index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index
+        arrays = {f'c{i}': frame[name].to_numpy(dtype=np.float64) for i, name in enumerate(frame.columns)}
+        arrays['index'] = naive_index.to_numpy(dtype='datetime64[ns]')
+        arrays['meta'] = np.array(json.dumps(meta))
+
+        path = self._path(ticker, interval)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"Bar store write failed for {ticker} ({interval}): {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
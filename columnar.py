@@ -0,0 +1,85 @@
+"""
+컬럼 단위 바이너리 응답 형식
+차트 시계열(가격/지표 배열)을 리틀 엔디언 float 버퍼로 그대로 내보내고,
+나머지 요약 섹션은 작은 JSON 헤더에 담습니다.
+
+레이아웃 (모든 구간은 8바이트 경계로 정렬)
+    b'STK1' | 헤더 길이 (uint32 LE) | 헤더 JSON (UTF-8) | 컬럼 버퍼 ...
+헤더
+    {"version": 1, "length": 봉 수, "payload": 요약 섹션,
+     "columns": [{"path": "ohlc.close", "dtype": "float64", "offset": 바이트 위치,
+                  "mask_offset": 결측 비트마스크 위치 또는 null}, ...]}
+    offset / mask_offset은 컬럼 버퍼 구간 시작(헤더 끝) 기준입니다.
+결측 비트마스크: 봉 i가 결측이면 i번째 비트가 1 (LSB 우선, np.packbits bitorder='little')
+"""
+import struct
+
+import numpy as np
+
+import fast_json
+
+MAGIC = b'STK1'
+VERSION = 1
+ALIGNMENT = 8
+
+
+def _pad(length):
+    return (-length) % ALIGNMENT
+
+
+def split_columns(payload, prefix=''):
+    """
+    응답 dict에서 배열 값(numpy 배열 / pandas Series)을 꺼내 (경로, 배열) 목록과 나머지 dict로 분리
+    경로는 점으로 이은 키 (예: 'macd.signal')
+    """
+    columns, rest = [], {}
+    for key, value in payload.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            nested_columns, nested_rest = split_columns(value, f"{path}.")
+            columns.extend(nested_columns)
+            if nested_rest:
+                rest[key] = nested_rest
+        elif hasattr(value, 'dtype') and getattr(value, 'ndim', 0) == 1:
+            columns.append((path, np.asarray(value)))
+        else:
+            rest[key] = value
+    return columns, rest
+
+
+def encode_columnar(payload, dtypes=None, default_dtype='float64', default=None):
+    """
+    응답 dict → 바이너리 본문 (bytes)
+    dtypes: {경로: 'float32' | 'float64'} - 없으면 default_dtype
+    default: 헤더 JSON에서 기본 타입이 아닌 값의 변환 함수 (fast_json.dumps의 default)
+    NaN/inf는 결측 비트마스크로 표시하고 버퍼에는 NaN으로 둡니다.
+    헤더의 요약 섹션도 JSON 응답과 같은 직렬화(NaN → null, numpy 스칼라 변환)를 거칩니다.
+    """
+    dtypes = dtypes or {}
+    columns, rest = split_columns(payload)
+    length = len(columns[0][1]) if columns else 0
+
+    specs, buffers, offset = [], [], 0
+    for path, values in columns:
+        dtype = np.dtype(dtypes.get(path, default_dtype)).newbyteorder('<')
+        data = values.astype(dtype, copy=False)
+        missing = ~np.isfinite(data)
+        if missing.any():
+            data = np.where(missing, np.nan, data).astype(dtype, copy=False)
+        spec = {'path': path, 'dtype': dtype.name, 'offset': offset, 'mask_offset': None}
+        raw = data.tobytes()
+        buffers.append(raw + b'\0' * _pad(len(raw)))
+        offset += len(raw) + _pad(len(raw))
+        if missing.any():
+            mask = np.packbits(missing, bitorder='little').tobytes()
+            spec['mask_offset'] = offset
+            buffers.append(mask + b'\0' * _pad(len(mask)))
+            offset += len(mask) + _pad(len(mask))
+        specs.append(spec)
+
+    header = fast_json.dumps(
+        {'version': VERSION, 'length': length, 'columns': specs, 'payload': rest}, default=default
+    ).encode('utf-8')
+    # 컬럼 버퍼 시작 위치가 8바이트 경계가 되도록 헤더 뒤를 공백으로 채움 (JSON으로도 유효)
+    header += b' ' * _pad(len(MAGIC) + 4 + len(header))
+    return b''.join([MAGIC, struct.pack('<I', len(header)), header, *buffers])
@@ -16,9 +16,77 @@ class Config:
     CACHE_TYPE = 'SimpleCache'
     CACHE_DEFAULT_TIMEOUT = 3600  # 1시간
     
+    # 응답 캐시 유지 시간 (초) - 간격별로 다르게 적용
+    RESPONSE_CACHE_TTLS = {
+        'intraday': 60,      # 분봉/시간봉
+        'daily': 3600,       # 일봉
+        'weekly': 6 * 3600,  # 주봉 이상
+        'info': 3600         # 기업 정보
+    }
+    RESPONSE_CACHE_MAX_STALENESS = 900  # 만료 후 갱신 중에 기존 응답을 내보낼 수 있는 최대 시간 (초)
+    RESPONSE_GZIP_LEVEL = 6  # 캐시에 넣을 때 한 번만 압축 (적중 시에는 압축하지 않음)
+    RESPONSE_BROTLI_QUALITY = 5  # brotli 패키지가 있을 때 함께 저장할 brotli 품질 (None이면 사용 안 함)
+    RESPONSE_REFRESH_MAX_WORKERS = 4  # 동시에 실행할 백그라운드 갱신 최대 개수
+    NEGATIVE_CACHE_TTL = 600  # 없는 종목/데이터 응답 캐시 유지 시간 (초)
+    SYMBOL_MASTER_STRICT = False  # True면 종목 목록(CSV)에 없는 티커를 업스트림 호출 없이 거절 (ETF/ETN/신규 상장 포함)
+    
+    # OHLCV 바 저장소 설정 (증분 다운로드)
+    BAR_STORE_ENABLED = True
+    BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR') or '.bar_store'
+    BAR_STORE_INTERVALS = ['1d', '1wk', '1mo']  # 저장 대상 간격
+    BAR_STORE_MIN_REFRESH = 60  # 같은 종목의 증분 요청 최소 간격 (초)
+    INDICATOR_STATE_ENABLED = True  # 지표 상태를 저장해 새 봉만 이어서 계산 (바 저장소 폴더 하위)
+    INDICATOR_STATE_MAX_VARIANTS = 3  # (티커, 간격)별로 남길 지표 파라미터 조합 수
+    INDICATOR_STATE_MAX_AGE = 30 * 86400  # 이 기간 동안 쓰이지 않은 지표 상태 파일 삭제 (precompute-payloads 실행 시, 초)
+    
+    # 펀더멘털 저장소 설정 (필드 그룹별 유지 시간, 초)
+    FUNDAMENTALS_STORE_DIR = os.environ.get('FUNDAMENTALS_STORE_DIR') or '.fundamentals_store'
+    FUNDAMENTALS_TTLS = {
+        'static': 7 * 86400,  # 회사 설명, 섹터, 국가 등
+        'daily': 86400,       # PER, ROE, 부채비율 등 재무 비율
+        'intraday': 900       # 시가총액 (fast_info로 갱신)
+    }
+    
+    # 종목 스크리너 (전체 종목 일괄 분석 스냅샷)
+    SCREENER_DB_PATH = os.environ.get('SCREENER_DB_PATH') or 'screener.sqlite3'
+    SCREENER_PERIOD = '1y'  # 지표 계산용 다운로드 기간
+    SCREENER_BATCH_SIZE = 100  # yf.download 1회당 종목 수
+    SCREENER_WORKERS = 4  # 분석 프로세스 수
+    
+    # 종목군 상관/베타 행렬 (하루 한 번 생성)
+    RISK_MATRIX_DIR = os.environ.get('RISK_MATRIX_DIR') or '.risk_matrix'
+    RISK_MATRIX_PERIOD = '1y'  # 수익률 행렬 기간 (같은 기간의 일봉 /api/stock은 행렬의 베타 사용)
+    RISK_MATRIX_MAX_AGE = 36 * 3600  # 이보다 오래된 행렬의 베타는 사용하지 않음 (초)
+    
+    # 섹터 집계 스냅샷 (flask build-sector-aggregates / precompute-payloads로 생성)
+    SECTOR_AGGREGATES_PATH = os.environ.get('SECTOR_AGGREGATES_PATH') or '.sector_aggregates.json'
+    SECTOR_SEED_RETRY_AFTER = 60  # 스냅샷 없이 백그라운드 생성 중일 때 /api/sectors의 Retry-After (초)
+    
+    # 장 마감 후 사전 계산 응답 (일봉 /api/stock)
+    PRECOMPUTED_ENABLED = True
+    PRECOMPUTED_DIR = os.environ.get('PRECOMPUTED_DIR') or '.precomputed'
+    PRECOMPUTE_RANGES = ['1mo', '3mo', '1y']  # 사전 계산할 기간 (일봉)
+    PRECOMPUTE_UNIVERSES = ['sp500']  # 기본 대상 종목군
+    PRECOMPUTE_WORKERS = 4  # 동시 처리 종목 수
+    
     # API 설정
     API_RATE_LIMIT = "100/hour"  # Rate limiting
     API_TIMEOUT = 30  # API 요청 타임아웃 (초)
+    JSON_SIGNIFICANT_DIGITS = 6  # 시계열 JSON 응답의 유효 숫자 자릿수 (None이면 반올림 없이 그대로)
+    REQUEST_DEADLINE = 20  # 요청 1건의 전체 업스트림 대기 마감 시간 (초)
+    UPSTREAM_MAX_WORKERS = 16  # 업스트림 동시 호출 최대 스레드 수
+    MULTI_TIMEFRAME_RESAMPLE = True  # 다중 시간대를 차트 데이터에서 파생 (부족할 때만 추가 다운로드)
+    SWEEP_MAX_COMBINATIONS = 2000  # 백테스트 스윕 1회의 최대 파라미터 조합 수
+    SWEEP_MAX_WORKERS = 1  # 2 이상이면 조합을 나눠 여러 프로세스에서 계산
+    
+    # 데이터 공급자 재시도 / 서킷 브레이커
+    PROVIDER_MAX_RETRIES = 3  # 최대 시도 횟수
+    PROVIDER_BACKOFF_BASE = 0.5  # 백오프 기본 대기 (초, 시도마다 2배)
+    PROVIDER_BACKOFF_MAX = 1.0  # 백오프 최대 대기 (초)
+    PROVIDER_RETRY_BUDGET = 2.0  # 요청 경로 호출 1건의 재시도 포함 총 한도 (초, REQUEST_DEADLINE보다 훨씬 짧게)
+    PROVIDER_BATCH_RETRY_BUDGET = 30.0  # 배치 작업(스크리너/상관 행렬 일괄 다운로드)의 재시도 총 한도 (초)
+    CIRCUIT_FAILURE_THRESHOLD = 5  # 연속 실패 시 서킷 개방 기준
+    CIRCUIT_RESET_TIMEOUT = 30  # 서킷 개방 후 시험 호출까지 대기 (초)
     
     # 보안 설정
     SESSION_COOKIE_SECURE = True
@@ -44,6 +112,12 @@ class ProductionConfig(Config):
     # 캐시 성능 향상
     CACHE_TYPE = 'FileSystemCache'
     CACHE_DIR = '/tmp/flask_cache'
+    BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR') or '/tmp/bar_store'
+    FUNDAMENTALS_STORE_DIR = os.environ.get('FUNDAMENTALS_STORE_DIR') or '/tmp/fundamentals_store'
+    SCREENER_DB_PATH = os.environ.get('SCREENER_DB_PATH') or '/tmp/screener.sqlite3'
+    PRECOMPUTED_DIR = os.environ.get('PRECOMPUTED_DIR') or '/tmp/precomputed'
+    RISK_MATRIX_DIR = os.environ.get('RISK_MATRIX_DIR') or '/tmp/risk_matrix'
+    SECTOR_AGGREGATES_PATH = os.environ.get('SECTOR_AGGREGATES_PATH') or '/tmp/sector_aggregates.json'
     
     # 보안 강화
     CORS_ORIGINS = [
@@ -55,6 +129,9 @@ class TestingConfig(Config):
     """테스트 환경 설정"""
     TESTING = True
     CACHE_TYPE = 'NullCache'  # 테스트시 캐시 비활성화
+    BAR_STORE_ENABLED = False
+    INDICATOR_STATE_ENABLED = False
+    PRECOMPUTED_ENABLED = False
 
 # 환경별 설정 매핑
 config = {
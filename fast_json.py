@@ -0,0 +1,144 @@
+"""
+NumPy 배열용 빠른 JSON 인코더
+응답 dict를 직접 JSON 텍스트로 만들며, 배열(numpy 배열 / pandas Series)은 원소별 파이썬 객체를 만들지 않고
+자릿수 행렬을 한 번에 계산해 바이트로 이어 붙입니다.
+- NaN / inf는 null (배열과 스칼라 모두)
+- digits를 주면 유효 숫자 digits 자리로 반올림 (정수부는 자르지 않음, 소수점 아래 끝자리 0 제거)
+- digits가 None이면 파이썬 repr과 같은 최단 표현 (느린 경로)
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+MAX_DIGITS = 17     # 정수 자릿수 상한 (초과하는 값이 있으면 느린 경로)
+MAX_DECIMALS = 12   # 소수점 아래 최대 자릿수
+POWERS = 10 ** np.arange(MAX_DIGITS, dtype=np.int64)
+NULL = np.frombuffer(b'null', dtype=np.uint8)
+
+
+def dumps(value, digits=None, default=None):
+    """
+    응답 객체 → JSON 문자열 (키 정렬, 공백 없음)
+    default: JSON 기본 타입이 아닌 값의 변환 함수 (json.dumps의 default와 같음)
+    """
+    return _encode(value, digits, default)
+
+
+def _encode(value, digits, default):
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda item: str(item[0]))
+        return '{' + ','.join(
+            f"{json.dumps(str(key), ensure_ascii=False)}:{_encode(item, digits, default)}" for key, item in items
+        ) + '}'
+    if isinstance(value, (pd.Series, pd.Index, np.ndarray)):
+        array = np.asarray(value)
+        if array.ndim == 1 and array.dtype.kind in 'iuf':
+            return encode_array(array, digits)
+        return _encode(array.tolist(), digits, default)
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_encode(item, digits, default) for item in value) + ']'
+    if isinstance(value, (bool, np.bool_)):
+        return 'true' if value else 'false'
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value)) if np.isfinite(value) else 'null'
+    if isinstance(value, np.integer):
+        return str(int(value))
+    return json.dumps(value, ensure_ascii=False, default=default)
+
+
+def encode_array(values, digits=None):
+    """1차원 숫자 배열 → JSON 배열 문자열"""
+    if values.dtype.kind in 'iu':
+        magnitudes = np.abs(values.astype(np.int64))
+        if len(values) and magnitudes.max() >= 10 ** MAX_DIGITS:
+            return _encode_slow(values)
+        return _format_fixed(values < 0, magnitudes, np.zeros(len(values), dtype=np.int64),
+                             np.zeros(len(values), dtype=bool))
+
+    values = np.asarray(values, dtype=np.float64)
+    missing = ~np.isfinite(values)
+    if digits is None:
+        return _encode_slow(values)
+
+    safe = np.where(missing, 0.0, values)
+    with np.errstate(divide='ignore'):
+        magnitude = np.floor(np.log10(np.abs(safe)))
+    decimals = np.where(np.isfinite(magnitude), digits - 1 - magnitude, 0)
+    decimals = np.clip(decimals, 0, MAX_DECIMALS).astype(np.int64)
+    scaled = np.rint(safe * 10.0 ** decimals)
+    if len(values) and np.abs(scaled).max() >= 10 ** MAX_DIGITS:
+        return _encode_slow(values)
+
+    mantissa = np.abs(scaled).astype(np.int64)
+    # 소수점 아래 끝자리 0 제거 (아직 0으로 끝나는 값만 남겨 가며 반복)
+    candidates = np.flatnonzero(decimals > 0)
+    while len(candidates):
+        quotient = mantissa[candidates] // 10
+        strip = mantissa[candidates] == quotient * 10
+        candidates = candidates[strip]
+        mantissa[candidates] = quotient[strip]
+        decimals[candidates] -= 1
+        candidates = candidates[decimals[candidates] > 0]
+    return _format_fixed((scaled < 0) & (mantissa > 0), mantissa, decimals, missing)
+
+
+def _format_fixed(negative, mantissa, decimals, missing):
+    """
+    정수 가수 + 소수 자릿수 → JSON 배열 문자열
+    값마다 [부호, 정수부 자리(오른쪽 정렬), 소수점, 소수부 자리(왼쪽 정렬), 구분자] 문자 행을 만들고
+    남길 칸만 행 순서대로 꺼내 이어 붙입니다. (자리 단위 반복, 가장 긴 값의 자릿수만큼)
+    """
+    count = len(mantissa)
+    if count == 0:
+        return '[]'
+    scale = POWERS[decimals]
+    integer = mantissa // scale
+    fraction = mantissa - integer * scale
+    integer_width = 1 + np.searchsorted(POWERS[1:], integer, side='right')
+    int_slots = int(integer_width.max())
+    frac_slots = int(decimals.max())
+    if missing.any():
+        int_slots = max(int_slots, len(NULL))
+
+    # 열(문자 위치) 단위로 채운 뒤 전치 - 행 하나가 값 하나
+    columns = int_slots + frac_slots + 3
+    matrix = np.empty((columns, count), dtype=np.uint8)
+    mask = np.empty((columns, count), dtype=bool)
+    matrix[0] = ord('-')
+    mask[0] = negative
+    # uint32 나눗셈이 int64보다 훨씬 빠름 (대부분의 가격/지표 값은 범위 안)
+    rest = integer.astype(np.uint32 if int(integer.max()) < 2 ** 32 else np.uint64)
+    for k in range(int_slots):
+        quotient = rest // 10
+        matrix[int_slots - k] = rest - quotient * 10 + ord('0')
+        mask[int_slots - k] = integer_width > k
+        rest = quotient
+    point = int_slots + 1
+    matrix[point] = ord('.')
+    mask[point] = decimals > 0
+    # 소수부는 frac_slots 자리로 왼쪽 정렬 (0.05 → "05")
+    rest = (fraction * POWERS[frac_slots - decimals]).astype(np.uint32 if frac_slots <= 9 else np.uint64)
+    for k in range(frac_slots - 1, -1, -1):
+        quotient = rest // 10
+        matrix[point + 1 + k] = rest - quotient * 10 + ord('0')
+        mask[point + 1 + k] = decimals > k
+        rest = quotient
+    matrix[-1] = ord(',')
+    mask[-1] = True
+    mask[-1, -1] = False
+
+    if missing.any():
+        matrix[1:1 + len(NULL), missing] = NULL[:, None]
+        mask[:-1, missing] = False
+        mask[1:1 + len(NULL), missing] = True
+    matrix, mask = np.ascontiguousarray(matrix.T), np.ascontiguousarray(mask.T)
+    return '[' + matrix[mask].tobytes().decode('ascii') + ']'
+
+
+def _encode_slow(values):
+    """원소별 최단 표현 (NaN/inf는 null)"""
+    objects = values.astype(object)
+    if values.dtype.kind == 'f':
+        objects[~np.isfinite(values)] = None
+    return json.dumps(objects.tolist())
@@ -0,0 +1,143 @@
+"""
+펀더멘털 정보 저장소
+stock.info 결과를 티커별 JSON 파일로 보관하고, 필드 성격에 따라 갱신 주기를 달리합니다.
+- static: 회사 설명/섹터 등 거의 바뀌지 않는 정보 (며칠 단위)
+- daily: 재무/가치평가 비율 (하루 단위)
+- intraday: 시가총액 등 가격 연동 값 (장중, fast_info로 가볍게 갱신)
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+FIELD_GROUPS = {
+    'static': [
+        'longName', 'sector', 'country', 'longBusinessSummary',
+        'currency', 'exchange', 'quoteType'
+    ],
+    'daily': [
+        'trailingPE', 'forwardPE', 'earningsGrowth', 'revenueGrowth',
+        'returnOnEquity', 'debtToEquity', 'priceToBook', 'dividendYield'
+    ],
+    'intraday': ['marketCap'],
+}
+
+# fast_info 키 → info 필드 이름
+FAST_INFO_FIELDS = {'marketCap': 'marketCap'}
+
+
+class FundamentalsStore:
+    """필드 그룹별 유지 시간을 가진 펀더멘털 저장소"""
+
+    def __init__(self, root_dir, ttls, fetch_info, fetch_fast_info=None, stats_fn=None):
+        self.root_dir = root_dir
+        self.ttls = ttls
+        self.fetch_info = fetch_info
+        self.fetch_fast_info = fetch_fast_info
+        self.stats_fn = stats_fn
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def get(self, ticker):
+        """
+        (필드 dict, 펀더멘털 점수) 반환
+        종목 정보가 없으면 (None, None)
+        """
+        with self._lock_for(ticker):
+            record = self._load(ticker)
+            now = time.time()
+            stale = [
+                group for group in FIELD_GROUPS
+                if record is None or now - record['fetched'].get(group, 0) > self.ttls[group]
+            ]
+
+            if 'static' in stale or 'daily' in stale:
+                info = self.fetch_info(ticker)
+                # 너무 적은 정보는 무효한 티커로 간주
+                if not info or len(info) < 5:
+                    return None, None
+                # info는 모든 그룹을 한 번에 주지만, static 필드는 유지 시간이 지났을 때만 덮어씀
+                groups = [group for group in FIELD_GROUPS if group != 'static' or group in stale]
+                record = self._record_from_info(info, now, record, groups)
+                self._save(ticker, record)
+            elif 'intraday' in stale:
+                self._refresh_intraday(ticker, record, now)
+                self._save(ticker, record)
+
+            return record['fields'], record['stats']
+
+    def peek(self, ticker):
+        """공급자 요청 없이 저장된 (필드 dict, 펀더멘털 점수) 반환 (없으면 (None, None))"""
+        with self._lock_for(ticker):
+            record = self._load(ticker)
+        if record is None:
+            return None, None
+        return record['fields'], record['stats']
+
+    def _record_from_info(self, info, now, record=None, groups=FIELD_GROUPS):
+        """info로 groups의 필드와 갱신 시각만 교체 (나머지 그룹은 기존 record 값 유지)"""
+        fields = dict(record['fields']) if record else {}
+        fetched = dict(record['fetched']) if record else {}
+        for group in (FIELD_GROUPS if record is None else groups):
+            for name in FIELD_GROUPS[group]:
+                if name in info:
+                    fields[name] = info[name]
+                else:
+                    fields.pop(name, None)
+            fetched[group] = now
+        return {
+            'fields': fields,
+            'stats': self.stats_fn(info) if self.stats_fn else None,
+            'fetched': fetched,
+        }
+
+    def _refresh_intraday(self, ticker, record, now):
+        """가격 연동 필드만 fast_info로 갱신 (실패 시 기존 값 유지)"""
+        if self.fetch_fast_info is None:
+            return
+        try:
+            fast_info = self.fetch_fast_info(ticker)
+            for fast_key, field in FAST_INFO_FIELDS.items():
+                value = fast_info[fast_key]
+                if value is not None:
+                    record['fields'][field] = value
+            record['fetched']['intraday'] = now
+        except Exception as e:
+            logging.warning(f"Intraday fundamentals refresh failed for {ticker}: {e}")
+
+    # --- 파일 입출력 ---
+    def _lock_for(self, ticker):
+        with self._locks_guard:
+            if ticker not in self._locks:
+                self._locks[ticker] = threading.Lock()
+            return self._locks[ticker]
+
+    def _path(self, ticker):
+        safe_ticker = re.sub(r'[^A-Za-z0-9.\-^=]', '_', ticker)
+        return os.path.join(self.root_dir, f"{safe_ticker}.json")
+
+    def _load(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"Fundamentals store read failed for {ticker}: {e}")
+            return None
+
+    def _save(self, ticker, record):
+        os.makedirs(self.root_dir, exist_ok=True)
+        path = self._path(ticker)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"Fundamentals store write failed for {ticker}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
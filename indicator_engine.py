@@ -0,0 +1,188 @@
+"""
+NumPy 기반 기술적 지표 엔진
+종가/고가/저가/거래량 배열을 한 번만 float64로 변환하고,
+모든 지표를 미리 할당한 출력 버퍼에 한 번에 계산합니다.
+pandas rolling/ewm 구현과 같은 규칙(NaN 처리, 초기값)을 따르므로 결과는 부동소수점 오차 범위에서 동일합니다.
+"""
+import numpy as np
+
+# EMA 블록 계산 시 감쇠 계수 거듭제곱이 오버플로하지 않도록 하는 지수 한도
+_EMA_BLOCK_LOG_LIMIT = 300.0
+
+
+def as_float_array(values):
+    """Series/리스트를 연속된 float64 배열로 변환 (이미 그렇다면 복사하지 않음)"""
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _window_sum(values, window):
+    """
+    길이 window 창의 합 (결과 길이 n - window + 1)
+    창 안의 값을 순서대로 더하므로 누적합 차분 방식과 달리 자릿수 손실이 없습니다.
+    """
+    count = len(values) - window + 1
+    total = values[:count].copy()
+    for offset in range(1, window):
+        total += values[offset:offset + count]
+    return total
+
+
+def rolling_sum(values, window, out=None):
+    """pandas rolling(window).sum()과 동일 (창 안에 NaN이 있으면 NaN)"""
+    out = _nan_buffer(len(values), out)
+    if 0 < window <= len(values):
+        out[window - 1:] = _window_sum(values, window)
+    return out
+
+
+def rolling_mean(values, window, out=None):
+    """pandas rolling(window).mean()과 동일"""
+    out = rolling_sum(values, window, out)
+    out /= window
+    return out
+
+
+def rolling_std(values, window, out=None):
+    """pandas rolling(window).std() (표본 표준편차, ddof=1)와 동일 (두 단계 계산)"""
+    out = _nan_buffer(len(values), out)
+    if 1 < window <= len(values):
+        count = len(values) - window + 1
+        mean = _window_sum(values, window) / window
+        squared = np.zeros(count, dtype=np.float64)
+        for offset in range(window):
+            deviation = values[offset:offset + count] - mean
+            squared += deviation * deviation
+        np.sqrt(squared / (window - 1), out=out[window - 1:])
+    return out
+
+
+def ema(values, span, out=None):
+    """pandas ewm(span=span, adjust=False).mean()과 동일"""
+    n = len(values)
+    out = np.empty(n, dtype=np.float64) if out is None else out
+    if n == 0:
+        return out
+
+    # pandas와 같은 방식으로 alpha 계산
+    com = (span - 1) / 2.0
+    alpha = 1.0 / (1.0 + com)
+    if np.isnan(values).any():
+        return _ema_with_gaps(values, alpha, out)
+
+    # y[t] = (1-a)·y[t-1] + a·x[t] 를 블록 단위 누적합으로 벡터화
+    decay = 1.0 - alpha
+    block = n if decay == 0 else max(1, int(_EMA_BLOCK_LOG_LIMIT / -np.log(decay)))
+    previous = values[0]  # y[-1] = x[0]로 두면 y[0] = x[0]
+    for start in range(0, n, block):
+        chunk = values[start:start + block]
+        steps = np.arange(len(chunk))
+        growth = decay ** -steps.astype(np.float64)
+        acc = np.cumsum(chunk * growth)
+        acc *= alpha
+        acc += decay * previous
+        out[start:start + len(chunk)] = acc / growth
+        previous = out[start + len(chunk) - 1]
+    out[0] = values[0]  # pandas와 같이 첫 값은 그대로
+    return out
+
+
+def _ema_with_gaps(values, alpha, out):
+    """NaN이 섞인 입력용 EMA (pandas ewm adjust=False, ignore_na=False 규칙 그대로)"""
+    old_wt_factor = 1.0 - alpha
+    weighted = values[0]
+    old_wt = 1.0
+    out[0] = weighted
+    for i in range(1, len(values)):
+        cur = values[i]
+        is_observation = cur == cur
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+def _nan_buffer(n, out):
+    if out is None:
+        return np.full(n, np.nan, dtype=np.float64)
+    out.fill(np.nan)
+    return out
+
+
+# --- 개별 지표 ---
+def bbands(close, length=20, std=2):
+    middle = rolling_mean(close, length)
+    deviation = rolling_std(close, length)
+    deviation *= std
+    return middle + deviation, middle, middle - deviation
+
+
+def rsi(close, length=14):
+    n = len(close)
+    delta = np.empty(n, dtype=np.float64)
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    # pandas where()와 같이 NaN은 0으로 처리
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = rolling_mean(gain, length)
+    avg_loss = rolling_mean(loss, length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    macd_line = ema(close, fast)
+    macd_line -= ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def vwap(high, low, close, volume, period=None):
+    typical_price = (high + low + close) / 3
+    price_volume = typical_price * volume
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if period:
+            # 기간 제한 VWAP
+            return rolling_sum(price_volume, period) / rolling_sum(volume, period)
+        # 누적 VWAP (pandas cumsum처럼 NaN은 건너뛰고 해당 위치만 NaN)
+        cumulative_pv = np.nancumsum(price_volume)
+        cumulative_volume = np.nancumsum(volume)
+        result = cumulative_pv / cumulative_volume
+        result[np.isnan(price_volume) | np.isnan(volume)] = np.nan
+        return result
+
+
+# --- 일괄 계산 ---
+def compute_indicators(close, high, low, volume, bb_length=20, bb_std=2.0, rsi_length=14,
+                       macd_fast=12, macd_slow=26, macd_signal=9, vwap_period=None, rsi_values=None):
+    """
+    차트에 필요한 모든 지표를 한 번에 계산해 배열 dict로 반환합니다.
+    입력은 Series 또는 배열이며 float64 변환은 한 번만 일어납니다.
+    rsi_values: 같은 길이로 이미 계산된 RSI (있으면 다시 계산하지 않음)
+    """
+    close = as_float_array(close)
+    high = as_float_array(high)
+    low = as_float_array(low)
+    volume = as_float_array(volume)
+
+    bb_upper, bb_middle, bb_lower = bbands(close, bb_length, bb_std)
+    macd_line, macd_signal_line, macd_hist = macd(close, macd_fast, macd_slow, macd_signal)
+    return {
+        'bb_upper': bb_upper,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_lower,
+        'rsi': rsi(close, rsi_length) if rsi_values is None else rsi_values,
+        'macd_line': macd_line,
+        'macd_signal': macd_signal_line,
+        'macd_hist': macd_hist,
+        'vwap': vwap(high, low, close, volume, vwap_period),
+    }
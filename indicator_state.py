@@ -0,0 +1,412 @@
+"""
+스트리밍 지표 상태
+EMA 값, 이동 합/제곱합, RSI 상승/하락 창, VWAP 누적값을 직렬화 가능한 상태로 보관하고
+새 봉이 들어오면 봉 하나당 상수 시간으로 갱신합니다.
+상태는 바 저장소의 전체 시계열 기준으로 (티커, 간격, 파라미터)별로 저장되며,
+같은 시작점의 시계열에 봉이 추가된 경우에만 재사용합니다. (그 외에는 전체 재계산)
+요청 기간은 호출하는 쪽에서 결과를 잘라 씁니다.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import indicator_engine
+from indicator_engine import as_float_array
+
+NAN = float('nan')
+
+# compute_indicators 반환 키 순서
+INDICATOR_NAMES = (
+    'bb_upper', 'bb_middle', 'bb_lower', 'rsi',
+    'macd_line', 'macd_signal', 'macd_hist', 'vwap'
+)
+
+
+def _finite(value):
+    return value == value
+
+
+def _divide(numerator, denominator):
+    """NumPy 나눗셈과 같은 결과 (0으로 나누면 inf 또는 NaN)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(numerator) / denominator)
+
+
+class EMAState:
+    """pandas ewm(span, adjust=False) 한 단계 갱신 (NaN 규칙 포함)"""
+
+    def __init__(self, span, value=NAN, old_wt=1.0):
+        self.span = span
+        self.alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.value = value
+        self.old_wt = old_wt
+
+    def update(self, x):
+        if _finite(self.value):
+            self.old_wt *= 1.0 - self.alpha
+            if _finite(x):
+                if self.value != x:
+                    self.value = (self.old_wt * self.value + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif _finite(x):
+            self.value = x
+        return self.value
+
+    @classmethod
+    def from_series(cls, values, span, ema_values):
+        """이미 계산된 EMA 배열의 마지막 값으로 상태 복원"""
+        state = cls(span, float(ema_values[-1]) if len(ema_values) else NAN)
+        if _finite(state.value):
+            # 끝에 이어진 결측 수만큼 이전 가중치가 감쇠된 상태
+            trailing = len(values) - 1 - int(np.flatnonzero(~np.isnan(values))[-1])
+            state.old_wt = (1.0 - state.alpha) ** trailing
+        return state
+
+    def to_dict(self):
+        return {'span': self.span, 'value': self.value, 'old_wt': self.old_wt}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['span'], data['value'], data['old_wt'])
+
+
+class RollingWindow:
+    """
+    고정 길이 창의 합/제곱합 (pandas rolling과 같이 창 안에 NaN이 있으면 NaN)
+    자릿수 손실을 줄이기 위해 기준값(shift)을 뺀 값으로 누적합니다.
+    """
+
+    def __init__(self, window, values=()):
+        self.window = window
+        self.values = deque((float(v) for v in values), maxlen=window)
+        finite = [v for v in self.values if _finite(v)]
+        self.shift = finite[0] if finite else 0.0
+        self.total = sum(v - self.shift for v in finite)
+        self.total_sq = sum((v - self.shift) ** 2 for v in finite)
+        self.nan_count = len(self.values) - len(finite)
+
+    def push(self, x):
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(x)
+        if _finite(x):
+            self.total += x - self.shift
+            self.total_sq += (x - self.shift) ** 2
+        else:
+            self.nan_count += 1
+
+    def _remove(self, x):
+        if _finite(x):
+            self.total -= x - self.shift
+            self.total_sq -= (x - self.shift) ** 2
+        else:
+            self.nan_count -= 1
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window and self.nan_count == 0
+
+    def sum(self):
+        return self.total + self.shift * self.window if self.ready else NAN
+
+    def mean(self):
+        return self.shift + self.total / self.window if self.ready else NAN
+
+    def std(self):
+        """표본 표준편차 (ddof=1)"""
+        if not self.ready or self.window < 2:
+            return NAN
+        variance = (self.total_sq - self.total * self.total / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self):
+        return {'window': self.window, 'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['window'], data['values'])
+
+
+class IndicatorState:
+    """차트 지표 전체의 스트리밍 상태 (compute_indicators와 같은 파라미터)"""
+
+    def __init__(self, params):
+        self.params = dict(params)
+        self.bb = RollingWindow(params['bb_length'])
+        self.prev_close = NAN
+        self.gains = RollingWindow(params['rsi_length'])
+        self.losses = RollingWindow(params['rsi_length'])
+        self.ema_fast = EMAState(params['macd_fast'])
+        self.ema_slow = EMAState(params['macd_slow'])
+        self.ema_signal = EMAState(params['macd_signal'])
+        period = params['vwap_period']
+        self.pv_window = RollingWindow(period) if period else None
+        self.volume_window = RollingWindow(period) if period else None
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+
+    def update(self, close, high, low, volume):
+        """봉 하나를 반영하고 INDICATOR_NAMES 순서의 지표 값을 반환"""
+        # 볼린저 밴드
+        self.bb.push(close)
+        middle = self.bb.mean()
+        deviation = self.bb.std() * self.params['bb_std']
+
+        # RSI (단순 이동평균, NaN 변화량은 0으로 처리)
+        delta = close - self.prev_close
+        self.prev_close = close
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+        rsi = 100 - _divide(100, 1 + _divide(self.gains.mean(), self.losses.mean()))
+
+        # MACD
+        macd_line = self.ema_fast.update(close) - self.ema_slow.update(close)
+        signal = self.ema_signal.update(macd_line)
+
+        # VWAP
+        price_volume = (high + low + close) / 3 * volume
+        if self.pv_window is not None:
+            self.pv_window.push(price_volume)
+            self.volume_window.push(volume)
+            pv_sum, volume_sum = self.pv_window.sum(), self.volume_window.sum()
+        else:
+            if _finite(price_volume):
+                self.cum_pv += price_volume
+            if _finite(volume):
+                self.cum_volume += volume
+            pv_sum, volume_sum = self.cum_pv, self.cum_volume
+            if not (_finite(price_volume) and _finite(volume)):
+                pv_sum = NAN
+        vwap = _divide(pv_sum, volume_sum)
+
+        return (
+            middle + deviation, middle, middle - deviation, rsi,
+            macd_line, signal, macd_line - signal, vwap
+        )
+
+    @classmethod
+    def from_history(cls, params, close, high, low, volume, indicators):
+        """
+        전체 배열과 벡터화 계산 결과(indicators)로 마지막 봉 직후의 상태를 만듭니다.
+        봉을 하나씩 다시 돌리지 않으므로 비용은 배열 슬라이스 몇 개 수준입니다.
+        """
+        state = cls(params)
+        if len(close) == 0:
+            return state
+        state.bb = RollingWindow(params['bb_length'], close[-params['bb_length']:])
+
+        state.prev_close = float(close[-1])
+        delta = np.empty(len(close), dtype=np.float64)
+        delta[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=delta[1:])
+        recent = delta[-params['rsi_length']:]
+        state.gains = RollingWindow(params['rsi_length'], np.where(recent > 0, recent, 0.0))
+        state.losses = RollingWindow(params['rsi_length'], np.where(recent < 0, -recent, 0.0))
+
+        state.ema_fast = EMAState.from_series(close, params['macd_fast'], indicator_engine.ema(close, params['macd_fast']))
+        state.ema_slow = EMAState.from_series(close, params['macd_slow'], indicator_engine.ema(close, params['macd_slow']))
+        state.ema_signal = EMAState.from_series(indicators['macd_line'], params['macd_signal'], indicators['macd_signal'])
+
+        price_volume = (high + low + close) / 3 * volume
+        period = params['vwap_period']
+        if period:
+            state.pv_window = RollingWindow(period, price_volume[-period:])
+            state.volume_window = RollingWindow(period, volume[-period:])
+        else:
+            state.cum_pv = float(np.nansum(price_volume))
+            state.cum_volume = float(np.nansum(volume))
+        return state
+
+    def to_dict(self):
+        return {
+            'params': self.params,
+            'bb': self.bb.to_dict(),
+            'prev_close': self.prev_close,
+            'gains': self.gains.to_dict(),
+            'losses': self.losses.to_dict(),
+            'ema_fast': self.ema_fast.to_dict(),
+            'ema_slow': self.ema_slow.to_dict(),
+            'ema_signal': self.ema_signal.to_dict(),
+            'pv_window': self.pv_window.to_dict() if self.pv_window is not None else None,
+            'volume_window': self.volume_window.to_dict() if self.volume_window is not None else None,
+            'cum_pv': self.cum_pv,
+            'cum_volume': self.cum_volume,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['params'])
+        state.bb = RollingWindow.from_dict(data['bb'])
+        state.prev_close = data['prev_close']
+        state.gains = RollingWindow.from_dict(data['gains'])
+        state.losses = RollingWindow.from_dict(data['losses'])
+        state.ema_fast = EMAState.from_dict(data['ema_fast'])
+        state.ema_slow = EMAState.from_dict(data['ema_slow'])
+        state.ema_signal = EMAState.from_dict(data['ema_signal'])
+        if data['pv_window'] is not None:
+            state.pv_window = RollingWindow.from_dict(data['pv_window'])
+            state.volume_window = RollingWindow.from_dict(data['volume_window'])
+        state.cum_pv = data['cum_pv']
+        state.cum_volume = data['cum_volume']
+        return state
+
+
+class IndicatorStateStore:
+    """
+    지표 배열과 마지막 완성 봉 시점의 상태를 함께 저장합니다.
+    새 요청의 시계열이 저장본과 같은 봉으로 시작하면 추가된 봉만 상태로 이어서 계산하고,
+    마지막(진행 중일 수 있는) 봉은 저장하지 않고 매번 상태 사본으로 계산합니다.
+    """
+
+    def __init__(self, root_dir, max_variants=3):
+        self.root_dir = root_dir
+        # 동적 파라미터는 시장 상황에 따라 바뀌므로 (티커, 간격)별로 최근에 쓴 조합만 남김
+        self.max_variants = max_variants
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def compute(self, key, frame, params):
+        """
+        frame(OHLCV)의 지표를 compute_indicators와 같은 형태(dict)로 반환
+        key: (티커, 간격) - frame은 항상 같은 시계열(바 저장소 전체)이어야 상태가 재사용됩니다.
+        """
+        close = as_float_array(frame['Close'])
+        high = as_float_array(frame['High'])
+        low = as_float_array(frame['Low'])
+        volume = as_float_array(frame['Volume'])
+        index = _index_ns(frame.index)
+        n = len(close)
+
+        with self._lock_for(key, params):
+            stored = self._load(key, params)
+            completed = stored[0].shape[0] if stored is not None else 0
+            if stored is None or n <= completed or not self._extends(stored, index, close):
+                return self._rebuild(key, params, index, close, high, low, volume)
+
+            stored_index, stored_close, stored_values, state = stored
+            # 새로 완성된 봉만 상태에 반영
+            new_rows = [state.update(close[i], high[i], low[i], volume[i]) for i in range(completed, n - 1)]
+            if new_rows:
+                appended = np.array(new_rows, dtype=np.float64).reshape(-1, len(INDICATOR_NAMES))
+                stored_values = np.vstack([stored_values, appended])
+                self._save(key, params, index[:n - 1], close[:n - 1], stored_values, state)
+
+            # 마지막 봉은 상태 사본으로 계산
+            last_row = IndicatorState.from_dict(state.to_dict()).update(close[-1], high[-1], low[-1], volume[-1])
+            values = np.vstack([stored_values, np.array([last_row], dtype=np.float64)])
+            return {name: values[:, i] for i, name in enumerate(INDICATOR_NAMES)}
+
+    def _rebuild(self, key, params, index, close, high, low, volume):
+        """전체 벡터화 계산 후 마지막 완성 봉 기준 상태를 저장"""
+        indicators = indicator_engine.compute_indicators(close, high, low, volume, **params)
+        if len(close) >= 2:
+            completed = len(close) - 1
+            head = {name: values[:completed] for name, values in indicators.items()}
+            state = IndicatorState.from_history(
+                params, close[:completed], high[:completed], low[:completed], volume[:completed], head
+            )
+            stored_values = np.column_stack([head[name] for name in INDICATOR_NAMES])
+            self._save(key, params, index[:completed], close[:completed], stored_values, state)
+        return indicators
+
+    @staticmethod
+    def _extends(stored, index, close):
+        """새 시계열이 저장된 봉들로 시작하는지 (수정주가 변경 시 종가가 달라짐)"""
+        stored_index, stored_close = stored[0], stored[1]
+        completed = len(stored_index)
+        return (
+            np.array_equal(index[:completed], stored_index)
+            and np.array_equal(close[:completed], stored_close, equal_nan=True)
+        )
+
+    # --- 파일 입출력 ---
+    def _lock_for(self, key, params):
+        path = self._path(key, params)
+        with self._locks_guard:
+            if path not in self._locks:
+                self._locks[path] = threading.Lock()
+            return self._locks[path]
+
+    def prune(self, max_age):
+        """max_age(초) 동안 쓰이지 않은 상태 파일 삭제 (삭제한 파일 수 반환)"""
+        if not os.path.isdir(self.root_dir):
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            try:
+                if name.endswith('.npz') and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass  # 다른 요청이 먼저 지웠거나 갱신 중
+        return removed
+
+    def _prefix(self, key):
+        ticker, interval = key
+        safe_ticker = re.sub(r'[^A-Za-z0-9.\-^=]', '_', ticker)
+        return f"{safe_ticker}_{interval}_"
+
+    def _path(self, key, params):
+        digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+        return os.path.join(self.root_dir, f"{self._prefix(key)}{digest}.npz")
+
+    def _evict_variants(self, key):
+        """같은 (티커, 간격)의 파라미터 조합 중 최근에 쓴 max_variants개만 남김"""
+        prefix = self._prefix(key)
+        pattern = re.compile(re.escape(prefix) + r'[0-9a-f]{10}\.npz$')
+        try:
+            paths = [os.path.join(self.root_dir, name) for name in os.listdir(self.root_dir) if pattern.match(name)]
+            paths.sort(key=os.path.getmtime, reverse=True)
+        except OSError:
+            return
+        for path in paths[self.max_variants:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load(self, key, params):
+        path = self._path(key, params)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(path)  # 최근 사용 시각 (조합 정리/오래된 파일 삭제 기준)
+            with np.load(path, allow_pickle=False) as stored:
+                meta = json.loads(str(stored['meta']))
+                if meta['params'] != params:
+                    return None
+                return stored['index'], stored['close'], stored['values'], IndicatorState.from_dict(meta['state'])
+        except Exception as e:
+            logging.warning(f"Indicator state read failed for {key}: {e}")
+            return None
+
+    def _save(self, key, params, index, close, values, state):
+        os.makedirs(self.root_dir, exist_ok=True)
+        meta = {'params': params, 'state': state.to_dict()}
+        path = self._path(key, params)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp.npz"
+        try:
+            np.savez(tmp_path, index=index, close=close, values=values, meta=np.array(json.dumps(meta)))
+            os.replace(tmp_path, path)
+            self._evict_variants(key)
+        except Exception as e:
+            logging.warning(f"Indicator state write failed for {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _index_ns(index):
+    """DatetimeIndex → UTC 기준 int64 나노초 배열 (비교용)"""
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
@@ -0,0 +1,132 @@
+"""
+사전 계산 응답 저장소
+장 마감 후 배치 작업이 만든 API 응답(JSON / 바이너리 컬럼 형식)을 gzip으로 압축해 (티커, 기간, 간격, 형식)별 파일로 보관합니다.
+매니페스트에 각 응답의 유효 구간(장 마감 ~ 다음 장 시작)을 기록하고,
+서버는 유효 구간 안의 요청을 파일 그대로 응답합니다. (pandas/네트워크 사용 없음)
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def content_etag(body):
+    """응답 본문의 내용 해시 (ETag용, 같은 내용이면 다시 계산해도 같은 값)"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class PayloadStore:
+    """사전 계산 응답 파일 + 매니페스트"""
+
+    def __init__(self, root_dir, compresslevel=9):
+        self.root_dir = root_dir
+        self.compresslevel = compresslevel
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(ticker, data_range, interval, variant='json'):
+        # variant: 응답 형식 (json 외 형식은 키/파일 이름에 붙임)
+        key = f"{ticker}:{data_range}:{interval}"
+        return key if variant == 'json' else f"{key}:{variant}"
+
+    # --- 배치 작업용 ---
+    def write(self, ticker, data_range, interval, body, valid_from, valid_until, variant='json'):
+        """
+        응답 본문(bytes)을 압축 저장하고 매니페스트 항목을 갱신합니다. (save_manifest로 반영)
+        valid_from / valid_until: 유효 구간 (epoch 초)
+        """
+        os.makedirs(self.root_dir, exist_ok=True)
+        filename = self._filename(ticker, data_range, interval, variant)
+        path = os.path.join(self.root_dir, filename)
+        compressed = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._load_manifest()
+            self._manifest[self.key(ticker, data_range, interval, variant)] = {
+                'file': filename,
+                'valid_from': valid_from,
+                'valid_until': valid_until,
+                'size': len(body),
+                'etag': content_etag(body),
+                'compressed_size': len(compressed),
+                'built_at': time.time(),
+            }
+        return len(compressed)
+
+    def save_manifest(self):
+        """매니페스트를 원자적으로 교체 (유효 구간이 지난 항목과 파일은 정리)"""
+        now = time.time()
+        with self._lock:
+            self._load_manifest()
+            expired = [key for key, entry in self._manifest.items() if entry['valid_until'] <= now]
+            for key in expired:
+                path = os.path.join(self.root_dir, self._manifest.pop(key)['file'])
+                if os.path.exists(path):
+                    os.remove(path)
+
+            os.makedirs(self.root_dir, exist_ok=True)
+            path = os.path.join(self.root_dir, MANIFEST_NAME)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._manifest, f)
+            os.replace(tmp_path, path)
+            self._manifest_mtime = os.stat(path).st_mtime_ns
+            return len(self._manifest)
+
+    # --- 서버 조회용 ---
+    def lookup(self, ticker, data_range, interval, now=None, variant='json'):
+        """현재 유효한 사전 계산 응답 항목 (없으면 None)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._load_manifest()
+            entry = self._manifest.get(self.key(ticker, data_range, interval, variant))
+        if entry is None or not entry['valid_from'] <= now < entry['valid_until']:
+            return None
+        return entry
+
+    def read(self, entry):
+        """gzip 압축된 응답 본문 (파일이 없으면 None)"""
+        try:
+            with open(os.path.join(self.root_dir, entry['file']), 'rb') as f:
+                return f.read()
+        except OSError as e:
+            logging.warning(f"Precomputed payload read failed for {entry['file']}: {e}")
+            return None
+
+    def _load_manifest(self):
+        """매니페스트 파일이 바뀌었을 때만 다시 읽습니다. (호출 측에서 _lock 보유)"""
+        path = os.path.join(self.root_dir, MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        except Exception as e:
+            logging.warning(f"Precomputed payload manifest read failed: {e}")
+
+    @staticmethod
+    def _filename(ticker, data_range, interval, variant='json'):
+        safe_ticker = re.sub(r'[^A-Za-z0-9.\-^=]', '_', ticker)
+        return f"{safe_ticker}_{data_range}_{interval}.{variant}.gz"
@@ -0,0 +1,156 @@
+"""
+데이터 공급자(yfinance) 호출 래퍼
+지수 백오프 + 지터 재시도와 호스트별 서킷 브레이커를 제공합니다.
+공급자가 불안정할 때 요청 스레드가 재시도 대기로 쌓이지 않도록 즉시 실패시킵니다.
+"""
+import logging
+import random
+import threading
+import time
+
+DEFAULT_HOST = 'finance.yahoo.com'
+
+
+class ProviderUnavailableError(ConnectionError):
+    """서킷 브레이커가 열려 있거나 공급자가 요청을 제한 중일 때 발생"""
+
+
+def is_not_found_error(e):
+    """종목 없음 오류 여부 (재시도해도 결과가 같으므로 즉시 실패 처리)"""
+    return "404" in str(e) or "No data found" in str(e)
+
+
+def is_rate_limited_error(e):
+    """공급자 요청 제한(429) 여부"""
+    message = str(e)
+    return (
+        type(e).__name__ == 'YFRateLimitError'
+        or "429" in message
+        or "Too Many Requests" in message
+        or "Rate limited" in message
+    )
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커
+    closed → (연속 실패 threshold회) → open → (reset_timeout 경과) → half_open → 성공 시 closed
+    """
+
+    def __init__(self, host, failure_threshold=5, reset_timeout=30):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """호출 허용 여부 (half_open에서는 시험 호출 1건만 허용)"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probe_in_flight = False
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logging.info(f"Circuit for {self.host} closed")
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self):
+        """요청 제한 등으로 즉시 차단"""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self.state != 'open':
+            logging.warning(f"Circuit for {self.host} opened after {self.failures} failures")
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures}
+
+
+class DataProvider:
+    """재시도/서킷 브레이커가 적용된 공급자 호출기"""
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=4.0, retry_budget=10.0,
+                 failure_threshold=5, reset_timeout=30):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker(self, host=DEFAULT_HOST):
+        with self._breakers_lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def is_available(self, host=DEFAULT_HOST):
+        """서킷이 열려 있지 않은지 (상태를 바꾸지 않는 조회용)"""
+        return self.breaker(host).snapshot()['state'] != 'open'
+
+    def call(self, fn, *args, host=DEFAULT_HOST, retry_budget=None, **kwargs):
+        """
+        fn(*args, **kwargs)를 호출합니다.
+        - 서킷이 열려 있으면 호출 없이 ProviderUnavailableError
+        - 종목 없음 오류는 재시도하지 않고 그대로 전달
+        - 요청 제한은 서킷을 즉시 열고 ProviderUnavailableError
+        - 그 외 오류는 지수 백오프 + 지터로 재시도 (호출 시간 포함 retry_budget 초 이내)
+        재시도 대기는 호출한 스레드에서 하므로, 요청 경로에서는 예산을 요청 마감 시간보다
+        훨씬 짧게 두고 (기본값) 배치 작업만 retry_budget으로 늘려 호출합니다.
+        """
+        breaker = self.breaker(host)
+        started = time.monotonic()
+        retry_budget = self.retry_budget if retry_budget is None else retry_budget
+
+        for attempt in range(self.max_retries):
+            if not breaker.allow():
+                raise ProviderUnavailableError(f"Circuit for {host} is open")
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if is_not_found_error(e):
+                    breaker.record_success()  # 공급자는 정상 응답
+                    raise
+                if is_rate_limited_error(e):
+                    breaker.trip()
+                    raise ProviderUnavailableError(f"{host} is rate limiting requests") from e
+                breaker.record_failure()
+                if breaker.snapshot()['state'] == 'open':
+                    raise ProviderUnavailableError(f"Circuit for {host} opened") from e
+
+                # 전체 재시도 예산을 넘기는 대기는 하지 않습니다 (Full Jitter)
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if attempt == self.max_retries - 1 or time.monotonic() - started + delay > retry_budget:
+                    raise
+                logging.info(f"Retrying {host} call in {delay:.2f}s after error: {e}")
+                time.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
@@ -0,0 +1,211 @@
+"""
+종목군 상관/공분산 행렬
+종목군 전체의 일간 수익률을 하나의 (날짜 × 종목) 행렬로 정렬하고,
+공분산/상관계수 행렬과 여러 벤치마크 대비 베타를 한 번의 행렬 연산으로 계산합니다.
+- 거래일이 다른 종목(KRX/미국)도 같은 행렬에 두고, 종목 쌍마다 공통 거래일만 사용
+- 결과는 종목군별 npz 파일로 저장하고 (하루 한 번 재생성), 서버는 파일이 바뀔 때만 다시 읽음
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+MIN_OBSERVATIONS = 60  # 행렬에 포함할 종목의 최소 수익률 개수
+MIN_COMMON_DATES = 31  # 베타 계산에 필요한 최소 공통 거래일 (calculate_risk_metrics와 동일)
+
+
+def returns_matrix(closes):
+    """
+    {심볼: 종가 Series} → (날짜 × 종목) 수익률 DataFrame
+    종목별로 자신의 거래일 기준 수익률을 구한 뒤 합집합 달력에 맞춥니다. (없는 날은 NaN)
+    """
+    columns = {}
+    for symbol, close in closes.items():
+        returns = close.dropna().pct_change().dropna()
+        returns = returns[np.isfinite(returns)]
+        if len(returns):
+            columns[symbol] = returns
+    if not columns:
+        return pd.DataFrame()
+    frame = pd.DataFrame(columns)
+    # 시간대가 다른 시장은 날짜 단위로 맞춤
+    frame.index = pd.DatetimeIndex([ts.date() for ts in frame.index])
+    return frame.groupby(level=0).last().sort_index()
+
+
+def pairwise_moments(x, y):
+    """
+    NaN을 제외한 쌍별 공분산/상관계수 (n-1 기준)와 공통 관측 수
+    x: (날짜 × m), y: (날짜 × k) → (m × k) 행렬 세 개
+    """
+    mask_x, mask_y = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(mask_x, x, 0.0), np.where(mask_y, y, 0.0)
+    mx, my = mask_x.astype(np.float64), mask_y.astype(np.float64)
+    counts = mx.T @ my
+    sum_xy = x0.T @ y0
+    sum_x = x0.T @ my   # y가 있는 날의 x 합
+    sum_y = mx.T @ y0   # x가 있는 날의 y 합
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = (sum_xy - sum_x * sum_y / counts) / (counts - 1)
+        # 분산도 공통 거래일 기준 (pandas DataFrame.corr와 같은 쌍별 정의)
+        variance_x = ((x0 * x0).T @ my - sum_x ** 2 / counts) / (counts - 1)
+        variance_y = (mx.T @ (y0 * y0) - sum_y ** 2 / counts) / (counts - 1)
+        correlation = covariance / np.sqrt(variance_x * variance_y)
+    covariance[counts < 2] = np.nan
+    correlation[counts < 2] = np.nan
+    return covariance, correlation, counts
+
+
+def compute_matrix(returns, benchmark_returns):
+    """
+    수익률 행렬 → 공분산/상관계수/관측 수 행렬과 벤치마크별 베타
+    베타는 calculate_risk_metrics와 같은 정의 (공통 거래일의 공분산(n-1) / 지수 분산(n))
+    """
+    values = returns.to_numpy(dtype=np.float64)
+    covariance, correlation, counts = pairwise_moments(values, values)
+
+    bench = benchmark_returns.reindex(returns.index).to_numpy(dtype=np.float64)
+    cross, _, cross_counts = pairwise_moments(values, bench)
+    # 종목과 공통인 날짜에서의 지수 분산 (n 기준)
+    mask_x, mask_b = ~np.isnan(values), ~np.isnan(bench)
+    b0 = np.where(mask_b, bench, 0.0)
+    mx = mask_x.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_b = (mx.T @ b0) / cross_counts
+        variance_b = (mx.T @ (b0 * b0)) / cross_counts - mean_b ** 2
+        betas = cross / variance_b
+    betas[(cross_counts < MIN_COMMON_DATES) | ~(variance_b > 0)] = np.nan
+    return covariance, correlation, counts, betas
+
+
+def build_matrix(closes, benchmark_closes, path, period='1y', min_observations=MIN_OBSERVATIONS):
+    """
+    종가 dict로 행렬을 계산해 path에 저장 (포함된 종목 수 반환)
+    benchmark_closes: {지수 심볼: 종가 Series}
+    """
+    started = time.time()
+    returns = returns_matrix(closes)
+    if returns.empty:
+        raise ValueError("행렬을 만들 수 있는 종목이 없습니다")
+    returns = returns.loc[:, returns.notna().sum() >= min_observations]
+    benchmark_returns = returns_matrix(benchmark_closes).reindex(columns=list(benchmark_closes))
+
+    covariance, correlation, counts, betas = compute_matrix(returns, benchmark_returns)
+    meta = {
+        'built_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'period': period,
+        'start_date': returns.index[0].isoformat(),
+        'end_date': returns.index[-1].isoformat(),
+        'observations': len(returns),
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    try:
+        np.savez(
+            tmp_path,
+            symbols=np.array(returns.columns, dtype=str),
+            benchmarks=np.array(benchmark_returns.columns, dtype=str),
+            covariance=covariance,
+            correlation=correlation,
+            counts=counts.astype(np.int32),
+            betas=betas,
+            meta=np.array(json.dumps(meta))
+        )
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logging.info(f"Risk matrix built: {returns.shape[1]} symbols x {len(returns)} days in {time.time() - started:.1f}s")
+    return returns.shape[1]
+
+
+class RiskMatrix:
+    """저장된 행렬 조회 (파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._loaded = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    with np.load(self.path, allow_pickle=False) as stored:
+                        symbols = [str(s) for s in stored['symbols']]
+                        self._loaded = {
+                            'symbols': symbols,
+                            'positions': {symbol: i for i, symbol in enumerate(symbols)},
+                            'benchmarks': [str(s) for s in stored['benchmarks']],
+                            'covariance': stored['covariance'],
+                            'correlation': stored['correlation'],
+                            'counts': stored['counts'],
+                            'betas': stored['betas'],
+                            'meta': json.loads(str(stored['meta'])),
+                        }
+                    self._mtime = mtime
+                except Exception as e:
+                    logging.warning(f"Risk matrix read failed for {self.path}: {e}")
+            return self._loaded
+
+    def meta(self):
+        loaded = self._load()
+        return dict(loaded['meta'], symbols=len(loaded['symbols'])) if loaded else None
+
+    def beta(self, symbol, benchmark):
+        """종목의 벤치마크 대비 베타 (행렬에 없으면 None)"""
+        loaded = self._load()
+        if not loaded or symbol not in loaded['positions'] or benchmark not in loaded['benchmarks']:
+            return None
+        value = loaded['betas'][loaded['positions'][symbol], loaded['benchmarks'].index(benchmark)]
+        return float(value) if np.isfinite(value) else None
+
+    def correlation(self, symbols):
+        """
+        요청 종목끼리의 상관계수/공분산 부분 행렬
+        반환: (행렬에 있는 종목 목록, 상관계수, 공분산, 벤치마크별 베타 dict)
+        """
+        loaded = self._load()
+        if not loaded:
+            return [], np.zeros((0, 0)), np.zeros((0, 0)), {}
+        found = [s for s in symbols if s in loaded['positions']]
+        index = np.array([loaded['positions'][s] for s in found], dtype=np.intp)
+        covariance = loaded['covariance'][np.ix_(index, index)]
+        correlation = loaded['correlation'][np.ix_(index, index)]
+        betas = {
+            symbol: dict(zip(loaded['benchmarks'], loaded['betas'][i].tolist()))
+            for symbol, i in zip(found, index)
+        }
+        return found, correlation, covariance, betas
+
+    def neighbors(self, symbol, limit=10, min_common=MIN_COMMON_DATES):
+        """
+        한 종목과 상관이 가장 높은/낮은 종목 목록 (한 행만 읽음)
+        반환: (가장 높은 [(심볼, 상관계수)], 가장 낮은 [(심볼, 상관계수)]) - 행렬에 없으면 None
+        """
+        loaded = self._load()
+        if not loaded or symbol not in loaded['positions']:
+            return None
+        i = loaded['positions'][symbol]
+        row = loaded['correlation'][i].copy()
+        row[i] = np.nan
+        row[loaded['counts'][i] < min_common] = np.nan
+        valid = np.flatnonzero(np.isfinite(row))
+        ranked = valid[np.argsort(row[valid])]
+        pick = lambda positions: [(loaded['symbols'][j], float(row[j])) for j in positions]
+        return pick(ranked[::-1][:limit]), pick(ranked[:limit])
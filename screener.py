@@ -0,0 +1,279 @@
+"""
+종목 스크리너
+KRX / NASDAQ / S&P 500 목록 전체에 지표/신호 계산을 일괄 실행하고,
+결과를 SQLite 스냅샷 테이블로 저장해 필터 조회를 스냅샷에서 바로 처리합니다.
+- 다운로드: 여러 종목을 한 번에 받는 yf.download 배치
+- 계산: 배치 단위로 프로세스 풀에 분배
+- 저장: 임시 파일에 만든 뒤 교체 (조회 중에도 항상 완성된 스냅샷)
+"""
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+UNIVERSES = ['krx', 'nasdaq', 'sp500']
+KRX_SUFFIXES = {'KOSPI': '.KS', 'KOSDAQ': '.KQ'}
+
+# 스냅샷 컬럼 (이름, SQLite 타입)
+SNAPSHOT_COLUMNS = [
+    ('symbol', 'TEXT PRIMARY KEY'),
+    ('name', 'TEXT'),
+    ('market', 'TEXT'),
+    ('sector', 'TEXT'),
+    ('krx', 'INTEGER'),
+    ('nasdaq', 'INTEGER'),
+    ('sp500', 'INTEGER'),
+    ('as_of', 'TEXT'),
+    ('close', 'REAL'),
+    ('change_pct', 'REAL'),
+    ('volume', 'REAL'),
+    ('volume_ratio', 'REAL'),
+    ('volatility', 'REAL'),
+    ('rsi', 'REAL'),
+    ('rsi_upper', 'REAL'),
+    ('rsi_lower', 'REAL'),
+    ('macd', 'REAL'),
+    ('macd_signal', 'REAL'),
+    ('macd_hist', 'REAL'),
+    ('golden_cross', 'INTEGER'),
+    ('dead_cross', 'INTEGER'),
+    ('bb_upper', 'REAL'),
+    ('bb_lower', 'REAL'),
+    ('bb_position', 'REAL'),
+    ('vwap', 'REAL'),
+]
+COLUMN_NAMES = [name for name, _ in SNAPSHOT_COLUMNS]
+NUMERIC_COLUMNS = [name for name, kind in SNAPSHOT_COLUMNS if kind == 'REAL']
+
+# 조건 필터 (쿼리 파라미터 이름 → SQL 조건)
+SIGNAL_FILTERS = {
+    'rsi_oversold': 'rsi < rsi_lower',
+    'rsi_overbought': 'rsi > rsi_upper',
+    'golden_cross': 'golden_cross = 1',
+    'dead_cross': 'dead_cross = 1',
+    'above_vwap': 'close > vwap',
+    'below_vwap': 'close < vwap',
+    'bb_upper_break': 'close > bb_upper',
+    'bb_lower_break': 'close < bb_lower',
+}
+INDEXED_COLUMNS = ['rsi', 'change_pct', 'sector', 'market']
+MAX_RESULTS = 500
+
+
+# --- 종목 목록 ---
+def load_universe(base_dir, universes=UNIVERSES):
+    """
+    종목 목록 CSV → yfinance 심볼 기준 종목 표
+    여러 목록에 속한 종목(예: NASDAQ 상장 S&P 500)은 한 행에 소속 플래그로 합칩니다.
+    """
+    rows = {}
+
+    def read_list(filename):
+        path = os.path.join(base_dir, filename)
+        if not os.path.exists(path):
+            logging.warning(f"Symbol list not found: {filename}")
+            return pd.DataFrame()
+        return pd.read_csv(path, dtype=str, encoding='utf-8-sig').fillna('')
+
+    def add(symbol, universe, **fields):
+        row = rows.setdefault(symbol, {'symbol': symbol, 'krx': 0, 'nasdaq': 0, 'sp500': 0, 'sector': None})
+        row[universe] = 1
+        row.update({key: value for key, value in fields.items() if value})
+
+    if 'krx' in universes:
+        krx = read_list('krx_stock_list.csv')
+        for code, name, market in zip(krx.get('Symbol', []), krx.get('Name', []), krx.get('Market', [])):
+            if market in KRX_SUFFIXES:
+                add(f"{code.zfill(6)}{KRX_SUFFIXES[market]}", 'krx', name=name, market=market)
+
+    if 'nasdaq' in universes:
+        nasdaq = read_list('nasdaq_stock_list.csv')
+        for symbol, name in zip(nasdaq.get('Symbol', []), nasdaq.get('Company Name', [])):
+            if symbol:
+                add(symbol.upper(), 'nasdaq', name=name, market='NASDAQ')
+
+    # S&P 500 정보(섹터 포함)를 우선합니다.
+    if 'sp500' in universes:
+        sp500 = read_list('sp500_stock_list.csv')
+        for symbol, name, sector in zip(sp500.get('Symbol_yfinance', []), sp500.get('Company Name', []), sp500.get('Sector', [])):
+            if symbol:
+                add(symbol.upper(), 'sp500', name=name, market='S&P 500', sector=sector)
+
+    return list(rows.values())
+
+
+# --- 배치 다운로드 ---
+def download_batch(symbols, period='1y', interval='1d'):
+    """여러 종목을 한 번에 다운로드해 심볼별 OHLCV dict로 반환 (데이터 없는 종목은 제외)"""
+    frame = yf.download(
+        symbols, period=period, interval=interval, group_by='ticker',
+        auto_adjust=True, threads=True, progress=False
+    )
+    if frame is None or frame.empty:
+        return {}
+    if not isinstance(frame.columns, pd.MultiIndex):
+        frame = pd.concat({symbols[0]: frame}, axis=1)
+
+    frames = {}
+    available = set(frame.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        data = frame[symbol].dropna(how='all')
+        if not data.empty:
+            frames[symbol] = data
+    return frames
+
+
+def build_snapshot(analyze_batch, universe, db_path, download=download_batch, period='1y',
+                   interval='1d', batch_size=100, workers=4):
+    """
+    종목 전체를 배치로 다운로드/분석해 스냅샷을 새로 만듭니다.
+    analyze_batch: {심볼: OHLCV} → [지표 행 dict] (프로세스 풀에서 실행되므로 모듈 수준 함수)
+    """
+    started = time.time()
+    members = {row['symbol']: row for row in universe}
+    symbols = list(members)
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+    rows = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for number, batch in enumerate(batches, 1):
+            try:
+                frames = download(batch, period=period, interval=interval)
+            except Exception as e:
+                logging.warning(f"Screener download failed for batch {number}/{len(batches)}: {e}")
+                continue
+            # 다운로드가 다음 배치를 받는 동안 분석은 풀에서 진행
+            pending.append(pool.submit(analyze_batch, frames))
+            logging.info(f"Screener batch {number}/{len(batches)}: {len(frames)}/{len(batch)} symbols downloaded")
+
+        for future in pending:
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                logging.warning(f"Screener analysis batch failed: {e}")
+
+    for row in rows:
+        row.update({key: value for key, value in members[row['symbol']].items() if key not in row})
+
+    snapshot = ScreenerSnapshot(db_path)
+    snapshot.replace(rows, built_at=pd.Timestamp.now(tz='UTC').isoformat())
+    logging.info(f"Screener snapshot built: {len(rows)}/{len(symbols)} symbols in {time.time() - started:.1f}s")
+    return len(rows)
+
+
+# --- 스냅샷 저장/조회 ---
+class ScreenerSnapshot:
+    """SQLite 스냅샷 테이블"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def replace(self, rows, built_at):
+        """임시 파일에 전체 스냅샷을 만든 뒤 원자적으로 교체 (built_at: ISO 시각)"""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.db_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            connection = sqlite3.connect(tmp_path)
+            with connection:
+                columns = ', '.join(f"{name} {kind}" for name, kind in SNAPSHOT_COLUMNS)
+                connection.execute(f"CREATE TABLE snapshot ({columns})")
+                connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                for name in INDEXED_COLUMNS:
+                    connection.execute(f"CREATE INDEX idx_snapshot_{name} ON snapshot ({name})")
+                placeholders = ', '.join('?' for _ in COLUMN_NAMES)
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO snapshot ({', '.join(COLUMN_NAMES)}) VALUES ({placeholders})",
+                    ([row.get(name) for name in COLUMN_NAMES] for row in rows)
+                )
+                connection.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    [('built_at', built_at), ('symbols', str(len(rows)))]
+                )
+            connection.close()
+            os.replace(tmp_path, self.db_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _connect(self):
+        # 읽기 전용 연결 (교체 중에도 이전 파일을 끝까지 읽음)
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def meta(self):
+        connection = self._connect()
+        try:
+            return dict(connection.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            connection.close()
+
+    def query(self, args):
+        """
+        쿼리 파라미터로 스냅샷을 조회합니다.
+        - 신호 조건: SIGNAL_FILTERS 이름=1 (예: rsi_oversold=1&golden_cross=1)
+        - 범위 조건: <숫자 컬럼>_min / <숫자 컬럼>_max (예: rsi_max=35)
+        - 소속/분류: universe, market, sector
+        - 정렬/개수: sort, order(asc/desc), limit
+        """
+        conditions, params = [], []
+
+        for name, condition in SIGNAL_FILTERS.items():
+            if args.get(name) in ('1', 'true'):
+                conditions.append(condition)
+
+        for column in NUMERIC_COLUMNS:
+            for suffix, operator in (('_min', '>='), ('_max', '<=')):
+                raw = args.get(column + suffix)
+                if raw is None or raw == '':
+                    continue
+                try:
+                    params.append(float(raw))
+                except ValueError:
+                    raise ValueError(f"{column}{suffix} 값은 숫자여야 합니다")
+                conditions.append(f"{column} {operator} ?")
+
+        universe = args.get('universe')
+        if universe:
+            if universe not in UNIVERSES:
+                raise ValueError(f"지원하지 않는 종목군입니다. 허용된 값: {', '.join(UNIVERSES)}")
+            conditions.append(f"{universe} = 1")
+        for column in ('market', 'sector'):
+            if args.get(column):
+                conditions.append(f"{column} = ?")
+                params.append(args.get(column))
+
+        sort = args.get('sort', 'symbol')
+        if sort not in COLUMN_NAMES:
+            raise ValueError(f"정렬할 수 없는 컬럼입니다: {sort}")
+        order = 'DESC' if args.get('order', 'asc').lower() == 'desc' else 'ASC'
+        try:
+            limit = min(int(args.get('limit', 100)), MAX_RESULTS)
+        except ValueError:
+            raise ValueError("limit 값은 정수여야 합니다")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        connection = self._connect()
+        try:
+            total = connection.execute(f"SELECT COUNT(*) FROM snapshot {where}", params).fetchone()[0]
+            cursor = connection.execute(
+                f"SELECT {', '.join(COLUMN_NAMES)} FROM snapshot {where} "
+                f"ORDER BY {sort} IS NULL, {sort} {order} LIMIT ?",
+                [*params, max(limit, 0)]
+            )
+            results = [dict(zip(COLUMN_NAMES, row)) for row in cursor.fetchall()]
+        finally:
+            connection.close()
+        return total, results
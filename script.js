@@ -444,7 +444,7 @@ function renderTechnicalAnalysisCard(data) {
                         </div>
                     </div>
                     <div class="col-4">
-                        <div class="small text-muted">베타 (vs KOSPI)</div>
+                        <div class="small text-muted">베타 (vs ${metrics.benchmark?.name || 'KOSPI'})</div>
                         <div class="fw-bold ${metrics.beta && Math.abs(metrics.beta - 1) < 0.2 ? 'text-success' : 'text-info'}">
                             ${metrics.beta !== null ? metrics.beta.toFixed(2) : 'N/A'}
                         </div>
@@ -618,7 +618,7 @@ function renderFundamentalStats(info) {
 }
 
 // --- 메인 로직 및 차트 함수 ---
-async function handleAnalysis() {
+async function handleAnalysis(revalidate = false) {
     const userInput = tickerInput.value.trim().toUpperCase();
     if (!userInput) return;
     showLoading(true);
@@ -628,11 +628,11 @@ async function handleAnalysis() {
     const period = periodSelect.value;
     const interval = intervalSelect.value;
     
-    // 캐시 확인
+    // 캐시 확인 (새로고침은 캐시가 유효해도 서버에 재검증)
     const cacheKey = getCacheKey(ticker, period, interval);
     const cachedData = getCachedData(cacheKey);
     
-    if (cachedData) {
+    if (cachedData && revalidate !== true) {
         // 캐시된 데이터 사용
         const compressedData = compressChartData(cachedData.chartData);
         currentChartData = compressedData;
@@ -685,13 +685,35 @@ async function handleAnalysis() {
         return;
     }
     
-    const chartApiUrl = `/api/stock?ticker=${ticker}&range=${period}&interval=${interval}`;
+    const chartApiUrl = `/api/stock?ticker=${ticker}&range=${period}&interval=${interval}&format=binary`;
     const infoApiUrl = `/api/stock/info?ticker=${ticker}`;
 
+    // 만료된 캐시도 ETag로 재검증 (내용이 같으면 본문 없는 304)
+    const cachedEntry = getCachedEntry(cacheKey);
+    // 캐시된 차트가 있으면 마지막 봉부터만 요청 (마지막 봉은 갱신됐을 수 있어 다시 받음)
+    const cachedChart = cachedEntry?.data.chartData;
+    const since = cachedChart?.timestamp?.length ? cachedChart.timestamp[cachedChart.timestamp.length - 1] : null;
+    // 저장된 차트 ETag는 그 응답을 받은 URL(since 값)에서만 유효
+    const chartEtag = cachedEntry?.etags.chartSince === since ? cachedEntry?.etags.chart : null;
+    const fullChartEtag = cachedEntry?.etags.chartSince === null ? cachedEntry?.etags.chart : null;
+
     try {
-        const [chartRes, infoRes] = await Promise.all([fetch(chartApiUrl), fetch(infoApiUrl)]);
-        const chartData = await chartRes.json();
-        const infoData = await infoRes.json();
+        const [chartRes, infoRes] = await Promise.all([
+            fetchRevalidated(since !== null ? `${chartApiUrl}&since=${since}` : chartApiUrl, chartEtag),
+            fetchRevalidated(infoApiUrl, cachedEntry?.etags.info)
+        ]);
+        let chartData = chartRes.status === 304 ? cachedChart : await readChartResponse(chartRes);
+        let chartEtags = { chart: chartRes.headers.get('ETag') || chartEtag, chartSince: since };
+        if (chartData.delta) {
+            chartData = mergeChartDelta(cachedChart, chartData);
+            if (!chartData) {
+                // 병합할 수 없으면 전체 응답을 조건부로 다시 받음 (캐시가 전체 응답 그대로면 304)
+                const fullRes = await fetchRevalidated(chartApiUrl, fullChartEtag);
+                chartData = fullRes.status === 304 ? cachedChart : await readChartResponse(fullRes);
+                chartEtags = { chart: fullRes.headers.get('ETag') || fullChartEtag, chartSince: null };
+            }
+        }
+        const infoData = infoRes.status === 304 ? cachedEntry.data.infoData : await infoRes.json();
 
         if (chartData.error || infoData.error) {
             throw new Error(chartData.error?.details || infoData.error?.details || '데이터를 가져오지 못했습니다.');
@@ -702,6 +724,9 @@ async function handleAnalysis() {
         setCachedData(cacheKey, {
             chartData: chartData,
             infoData: infoData
+        }, {
+            ...chartEtags,
+            info: infoRes.headers.get('ETag')
         });
         
         currentChartData = compressedData;
@@ -979,7 +1004,7 @@ function initMobileTouchHandlers() {
             // 현재 검색어로 새로고침
             const ticker = tickerInput.value.trim();
             if (ticker) {
-                handleAnalysis();
+                handleAnalysis(true);
             }
             pullToRefreshElement.remove();
             pullToRefreshElement = null;
@@ -1064,7 +1089,7 @@ function scrollToAnalysis() {
 function refreshCurrentAnalysis() {
     const ticker = tickerInput.value.trim();
     if (ticker) {
-        handleAnalysis();
+        handleAnalysis(true);
     }
     if (fabMenuOpen) toggleFabMenu();
 }
@@ -1149,9 +1174,16 @@ function getCachedData(cacheKey) {
     return null;
 }
 
-function setCachedData(cacheKey, data) {
+// 만료 여부와 관계없이 캐시 항목 (ETag 재검증용)
+function getCachedEntry(cacheKey) {
+    return chartDataCache.get(cacheKey) || null;
+}
+
+function setCachedData(cacheKey, data, etags = {}) {
+    chartDataCache.delete(cacheKey); // 다시 저장한 항목이 가장 나중에 제거되도록
     chartDataCache.set(cacheKey, {
         data: data,
+        etags: etags,
         timestamp: Date.now()
     });
     
@@ -1162,6 +1194,116 @@ function setCachedData(cacheKey, data) {
     }
 }
 
+// 이전 응답의 ETag가 있으면 조건부 요청 (304면 캐시된 데이터를 그대로 사용)
+function fetchRevalidated(url, etag) {
+    return etag ? fetch(url, { headers: { 'If-None-Match': etag } }) : fetch(url);
+}
+
+// --- 증분 응답 (since=, 서버 slice_since 참고) ---
+const CHART_SERIES_PATHS = [
+    'timestamp', 'ohlc.open', 'ohlc.high', 'ohlc.low', 'ohlc.close', 'ohlc.volume',
+    'bbands.upper', 'bbands.middle', 'bbands.lower', 'rsi',
+    'macd.line', 'macd.signal', 'macd.histogram', 'vwap'
+];
+
+// 시계열 값에 영향을 주는 동적 파라미터 (바뀌면 이전 봉의 지표 값도 달라짐)
+function indicatorParamsKey(dynamicAnalysis) {
+    const t = dynamicAnalysis?.thresholds || {};
+    return JSON.stringify([t.bollinger?.period, t.bollinger?.std_dev, t.macd?.fast, t.macd?.slow, t.macd?.signal, t.vwap?.period]);
+}
+
+// 기준 종가 비교 (JSON 응답은 유효 숫자 6자리로 반올림되어 있어 상대 오차 허용)
+function sameClose(a, b) {
+    if (a == null || b == null) return a == null && b == null;
+    return Math.abs(a - b) <= 1e-5 * Math.max(Math.abs(a), Math.abs(b));
+}
+
+// 캐시된 차트 + 증분 응답 → 전체 차트 데이터 (기준이 달라져 병합할 수 없으면 null)
+// 기간이 앞으로 밀린 경우(예: 1y 차트를 다음 날 다시 요청)에는 겹치는 구간만 비교해 앞쪽 봉을 버립니다.
+function mergeChartDelta(cached, update) {
+    const { since, first_timestamp: firstTimestamp } = update.delta;
+    if (!cached?.timestamp?.length || !cached.ohlc) return null;
+    if (indicatorParamsKey(cached.dynamic_analysis) !== indicatorParamsKey(update.dynamic_analysis)) return null;
+
+    // 새 기간의 첫 봉이 캐시에 있어야 겹치는 구간을 이어 붙일 수 있음
+    const head = cached.timestamp.indexOf(firstTimestamp);
+    if (head === -1) return null;
+    let keep = cached.timestamp.findIndex(ts => ts >= since);
+    if (keep === -1) keep = cached.timestamp.length;
+    if (keep < head) return null;
+    // 분할/배당 수정으로 since 이전 가격이 바뀌었으면 (첫 봉, 직전 봉 종가로 확인) 전체를 다시 받음
+    if (!sameClose(cached.ohlc.close[head], update.delta.first_close)) return null;
+    const anchorTimestamp = keep > head ? cached.timestamp[keep - 1] : null;
+    if (anchorTimestamp !== update.delta.anchor_timestamp) return null;
+    if (keep > head && !sameClose(cached.ohlc.close[keep - 1], update.delta.anchor_close)) return null;
+    const merged = { ...update };
+    delete merged.delta;
+    CHART_SERIES_PATHS.forEach(path => {
+        const keys = path.split('.');
+        const last = keys.pop();
+        const source = keys.reduce((obj, key) => obj[key], cached)[last];
+        const target = keys.reduce((obj, key) => obj[key], merged);
+        target[last] = source.slice(head, keep).concat(Array.from(target[last]));
+    });
+    return merged.timestamp.length === merged.metadata.data_points ? merged : null;
+}
+
+// --- 바이너리 컬럼 응답 (format=binary, 서버 columnar.py 형식) ---
+const BINARY_MIMETYPE = 'application/vnd.stock-columns';
+const BINARY_DTYPES = { float32: Float32Array, float64: Float64Array };
+
+// 차트 응답 읽기 (에러 응답은 항상 JSON)
+async function readChartResponse(response) {
+    const contentType = response.headers.get('Content-Type') || '';
+    if (contentType.includes(BINARY_MIMETYPE)) {
+        return columnsToArrays(decodeColumnarPayload(await response.arrayBuffer()));
+    }
+    return response.json();
+}
+
+// 바이너리 본문 → 요약 섹션 + 타입 배열 (버퍼를 복사하지 않는 뷰)
+function decodeColumnarPayload(buffer) {
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'STK1') throw new Error('지원하지 않는 응답 형식입니다');
+    const headerLength = new DataView(buffer).getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+    const base = 8 + headerLength;
+
+    const payload = header.payload;
+    payload.columns = {};
+    payload.nullMasks = {};
+    header.columns.forEach(column => {
+        // 리틀 엔디언 버퍼 (브라우저 타입 배열도 리틀 엔디언)
+        const values = new BINARY_DTYPES[column.dtype](buffer, base + column.offset, header.length);
+        payload.columns[column.path] = values;
+        if (column.mask_offset !== null) {
+            payload.nullMasks[column.path] = new Uint8Array(buffer, base + column.mask_offset, Math.ceil(header.length / 8));
+        }
+        // 'macd.signal' → payload.macd.signal
+        const keys = column.path.split('.');
+        const last = keys.pop();
+        const target = keys.reduce((obj, key) => (obj[key] = obj[key] || {}), payload);
+        target[last] = values;
+    });
+    return payload;
+}
+
+// 타입 배열 → 결측을 null로 둔 일반 배열 (기존 차트/분석 카드 렌더링 형식)
+function columnsToArrays(payload) {
+    Object.entries(payload.columns).forEach(([path, values]) => {
+        const mask = payload.nullMasks[path];
+        const array = mask
+            ? Array.from(values, (v, i) => ((mask[i >> 3] >> (i & 7)) & 1 ? null : v))
+            : Array.from(values);
+        const keys = path.split('.');
+        const last = keys.pop();
+        keys.reduce((obj, key) => obj[key], payload)[last] = array;
+    });
+    delete payload.columns;
+    delete payload.nullMasks;
+    return payload;
+}
+
 // 데이터 압축 (중복 제거 및 정밀도 조정)
 function compressChartData(data) {
     if (!data || !data.timestamp) return data;
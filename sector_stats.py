@@ -0,0 +1,213 @@
+"""
+섹터 집계
+S&P 500 목록의 GICS Sector 열로 종목을 묶어 섹터별 지표를 메모리에 유지합니다.
+- 수익률: 동일가중 / 시가총액가중 (최근 1일, 1개월)
+- 변동성: 동일가중 섹터 일간 수익률의 연율화 표준편차
+- 시장 폭: VWAP 위 종목 비율, MACD 강세(라인 > 시그널) 종목 비율
+- 펀더멘털: 종목별 펀더멘털 점수의 중앙값
+종목 값이 바뀌면 표시만 해 두고, 조회할 때 바뀐 섹터만 다시 계산합니다.
+구성 종목 상태는 JSON 스냅샷으로 저장해 서버 시작 시 바로 불러올 수 있습니다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+RETURN_WINDOW = 63  # 종목별로 보관하는 최근 일간 수익률 수 (약 3개월)
+MONTH_BARS = 21
+SCORE_FIELDS = ['value', 'growth', 'profitability', 'stability']
+
+
+class SectorAggregates:
+    """섹터별 집계 (구성 종목 상태 + 섹터 결과 캐시)"""
+
+    def __init__(self, members, window=RETURN_WINDOW):
+        # members: {심볼: 섹터}
+        self.members = {symbol: sector for symbol, sector in members.items() if sector}
+        self.window = window
+        self._state = {}
+        self._results = {}
+        self._dirty = set(self.sectors())
+        self._lock = threading.Lock()
+
+    def sectors(self):
+        return sorted(set(self.members.values()))
+
+    def is_member(self, symbol):
+        return symbol in self.members
+
+    # --- 종목 갱신 ---
+    def update_series(self, symbol, returns, above_vwap=None, macd_bullish=None):
+        """
+        종목의 일간 수익률(날짜 인덱스 Series)과 마지막 봉 신호를 반영합니다.
+        기존 수익률보다 앞선 구간은 유지하고, 겹치는 날짜는 새 값으로 바꿉니다.
+        """
+        if symbol not in self.members:
+            return
+        returns = returns.dropna()
+        returns = returns[np.isfinite(returns)]
+        if returns.empty:
+            return
+        returns = pd.Series(
+            returns.to_numpy(dtype=np.float64),
+            index=pd.DatetimeIndex([ts.date() for ts in returns.index])
+        )
+        with self._lock:
+            state = self._state.setdefault(symbol, {})
+            previous = state.get('returns')
+            if previous is not None:
+                returns = pd.concat([previous[previous.index < returns.index[0]], returns])
+            state['returns'] = returns.tail(self.window)
+            state['above_vwap'] = above_vwap
+            state['macd_bullish'] = macd_bullish
+            self._dirty.add(self.members[symbol])
+
+    def update_fundamentals(self, symbol, market_cap, stats):
+        """종목의 시가총액과 펀더멘털 점수(calculate_fundamental_stats 결과)를 반영합니다."""
+        if symbol not in self.members:
+            return
+        with self._lock:
+            state = self._state.setdefault(symbol, {})
+            state['market_cap'] = market_cap if isinstance(market_cap, (int, float)) and market_cap > 0 else None
+            state['stats'] = stats
+            self._dirty.add(self.members[symbol])
+
+    # --- 스냅샷 ---
+    def save(self, path):
+        """구성 종목 상태를 JSON 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            state = {symbol: _state_to_dict(values) for symbol, values in self._state.items()}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'built_at': time.time(), 'state': state}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, members, window=RETURN_WINDOW):
+        """저장된 상태로 집계 생성 (현재 구성 종목이 아닌 종목은 제외, 파일이 없거나 읽지 못하면 None)"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except Exception as e:
+            logging.warning(f"Sector aggregates read failed for {path}: {e}")
+            return None
+        aggregates = cls(members, window)
+        for symbol, values in stored['state'].items():
+            if symbol in aggregates.members:
+                aggregates._state[symbol] = _state_from_dict(values)
+        return aggregates
+
+    # --- 조회 ---
+    def get(self, sector=None):
+        """섹터 결과 목록 (sector를 주면 해당 섹터만, 없는 섹터면 None)"""
+        if sector is not None and sector not in self.members.values():
+            return None
+        with self._lock:
+            for name in self._dirty:
+                self._results[name] = self._aggregate(name)
+            self._dirty.clear()
+            if sector is not None:
+                return self._results[sector]
+            return [self._results[name] for name in sorted(self._results)]
+
+    def _aggregate(self, sector):
+        """섹터 1개 집계 (호출 측에서 _lock 보유)"""
+        symbols = [symbol for symbol, name in self.members.items() if name == sector]
+        states = {symbol: self._state[symbol] for symbol in symbols if symbol in self._state}
+        series = {symbol: state['returns'] for symbol, state in states.items() if 'returns' in state}
+
+        result = {
+            'sector': sector,
+            'members': len(symbols),
+            'covered': len(series),
+            'as_of': None,
+            'returns': {'1d': None, '1mo': None},
+            'volatility': None,
+            'breadth': {
+                'above_vwap': _share([state.get('above_vwap') for state in states.values()]),
+                'macd_bullish': _share([state.get('macd_bullish') for state in states.values()]),
+            },
+            'fundamentals': _median_scores([state.get('stats') for state in states.values()]),
+        }
+        if not series:
+            return result
+
+        # (날짜 × 종목) 수익률 - 종목마다 거래일이 달라도 날짜로 정렬
+        frame = pd.DataFrame(series).sort_index().tail(self.window)
+        values = frame.to_numpy(dtype=np.float64)
+        caps = np.array([states[symbol].get('market_cap') or np.nan for symbol in frame.columns], dtype=np.float64)
+
+        last = np.array([series[symbol].iloc[-1] for symbol in frame.columns])
+        month = np.array([np.prod(1 + series[symbol].tail(MONTH_BARS).to_numpy()) - 1 for symbol in frame.columns])
+        result['returns'] = {
+            '1d': _weighted_returns(last, caps),
+            '1mo': _weighted_returns(month, caps),
+        }
+
+        # 모든 날짜에 최소 1개 종목의 수익률이 있음 (합집합 달력)
+        daily = np.nanmean(values, axis=1)
+        if len(daily) >= 2:
+            result['volatility'] = round(float(np.std(daily, ddof=1) * np.sqrt(252) * 100), 2)
+        result['as_of'] = frame.index[-1].isoformat()
+        return result
+
+
+def _state_to_dict(state):
+    data = {key: value for key, value in state.items() if key != 'returns'}
+    returns = state.get('returns')
+    if returns is not None:
+        data['returns'] = {
+            'dates': [ts.date().isoformat() for ts in returns.index],
+            'values': returns.tolist(),
+        }
+    return data
+
+
+def _state_from_dict(data):
+    state = dict(data)
+    if 'returns' in data:
+        state['returns'] = pd.Series(
+            np.array(data['returns']['values'], dtype=np.float64),
+            index=pd.DatetimeIndex(data['returns']['dates'])
+        )
+    return state
+
+
+def _weighted_returns(returns, caps):
+    """동일가중 / 시가총액가중 수익률 (%)"""
+    equal = float(np.mean(returns) * 100)
+    has_cap = np.isfinite(caps)
+    cap_weighted = None
+    if has_cap.any():
+        cap_weighted = round(float(np.average(returns[has_cap], weights=caps[has_cap]) * 100), 2)
+    return {'equal_weighted': round(equal, 2), 'cap_weighted': cap_weighted}
+
+
+def _share(flags):
+    """True 비율 (%) - 값이 없는 종목(None)은 제외"""
+    known = [flag for flag in flags if flag is not None]
+    if not known:
+        return None
+    return round(sum(known) / len(known) * 100, 1)
+
+
+def _median_scores(stats_list):
+    """펀더멘털 점수 중앙값 (0점은 데이터 없음으로 보고 제외)"""
+    stats_list = [stats for stats in stats_list if stats]
+    medians = {}
+    for field in SCORE_FIELDS:
+        scores = [stats['scores'].get(field, 0) for stats in stats_list]
+        scores = [score for score in scores if score > 0]
+        medians[field] = float(np.median(scores)) if scores else None
+    totals = [stats['totalScore'] for stats in stats_list if stats.get('totalScore')]
+    medians['totalScore'] = round(float(np.median(totals)), 1) if totals else None
+    return {'covered': len(stats_list), 'median_scores': medians}
@@ -1,7 +1,13 @@
 # server.py (환경변수 설정 및 보안 강화 버전)
 
+import datetime
+import gzip
+import inspect
 import logging
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import click
 import numpy as np
 import pandas as pd
 import yfinance as yf
@@ -10,7 +16,25 @@ from flask_cors import CORS
 from flask_caching import Cache
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+try:
+    import brotli  # 선택 의존성: 설치되어 있으면 캐시 응답을 brotli로도 압축해 둠
+except ImportError:
+    brotli = None
 from config import get_config
+from bar_store import BarStore, slice_period, yfinance_history
+from provider import DataProvider, is_not_found_error
+from fundamentals_store import FundamentalsStore
+import indicator_engine
+from indicator_engine import as_float_array
+from indicator_state import IndicatorStateStore
+from analysis_context import AnalysisContext
+from backtest_sweep import grid_combinations, parse_grid, run_sweep
+from screener import UNIVERSES, ScreenerSnapshot, build_snapshot, download_batch, load_universe
+from payload_store import PayloadStore, content_etag
+from risk_matrix import RiskMatrix, build_matrix, returns_matrix
+from sector_stats import SectorAggregates
+from columnar import encode_columnar
+import fast_json
 
 # --- Flask 앱 및 설정 ---
 def create_app():
@@ -69,6 +93,51 @@ def create_app():
 
 app, limiter, cache = create_app()
 
+# 데이터 공급자 호출기 (백오프 재시도 + 서킷 브레이커)
+provider = DataProvider(
+    max_retries=app.config['PROVIDER_MAX_RETRIES'],
+    backoff_base=app.config['PROVIDER_BACKOFF_BASE'],
+    backoff_max=app.config['PROVIDER_BACKOFF_MAX'],
+    retry_budget=app.config['PROVIDER_RETRY_BUDGET'],
+    failure_threshold=app.config['CIRCUIT_FAILURE_THRESHOLD'],
+    reset_timeout=app.config['CIRCUIT_RESET_TIMEOUT']
+)
+
+def provider_history(ticker, **kwargs):
+    """공급자 래퍼를 거친 yfinance history"""
+    return provider.call(yfinance_history, ticker, **kwargs)
+
+# OHLCV 증분 저장소 (비활성화 시 매번 전체 구간 다운로드)
+bar_store = BarStore(
+    app.config['BAR_STORE_DIR'],
+    intervals=app.config['BAR_STORE_INTERVALS'] if app.config['BAR_STORE_ENABLED'] else (),
+    min_refresh=app.config['BAR_STORE_MIN_REFRESH'],
+    fetch=provider_history
+)
+
+# 지표 스트리밍 상태 저장소 (같은 시작점의 시계열은 새 봉만 이어서 계산)
+indicator_states = IndicatorStateStore(
+    os.path.join(app.config['BAR_STORE_DIR'], 'indicators'), max_variants=app.config['INDICATOR_STATE_MAX_VARIANTS']
+) if app.config['INDICATOR_STATE_ENABLED'] else None
+
+# 장 마감 후 미리 계산한 응답 저장소 (flask precompute-payloads 명령으로 생성)
+payload_store = PayloadStore(app.config['PRECOMPUTED_DIR']) if app.config['PRECOMPUTED_ENABLED'] else None
+
+# 종목 스크리너 스냅샷 (flask build-screener 명령으로 생성)
+screener_snapshot = ScreenerSnapshot(app.config['SCREENER_DB_PATH'])
+
+# 종목군별 상관/베타 행렬 (flask build-risk-matrix 명령으로 생성)
+risk_matrices = {
+    universe: RiskMatrix(os.path.join(app.config['RISK_MATRIX_DIR'], f"{universe}.npz"))
+    for universe in UNIVERSES
+}
+
+# 업스트림(yfinance) 동시 요청용 실행기 (요청 간 공유, 최대 동시 호출 수 제한)
+upstream_executor = ThreadPoolExecutor(
+    max_workers=app.config['UPSTREAM_MAX_WORKERS'],
+    thread_name_prefix='upstream'
+)
+
 
 # --- 웹 페이지 및 정적 파일 라우팅 ---
 @app.route('/')
@@ -78,48 +147,47 @@ def serve_index():
 
 
 # --- 직접 만드는 기술적 분석 함수들 ---
+# 계산은 NumPy 지표 엔진(indicator_engine)에서 수행하고, 기존 호출부를 위해 Series로 감싸 반환합니다.
 def calculate_bbands(close, length=20, std=2):
-    middle_band = close.rolling(window=length).mean()
-    std_dev = close.rolling(window=length).std()
-    upper_band = middle_band + (std_dev * std)
-    lower_band = middle_band - (std_dev * std)
-    return upper_band, middle_band, lower_band
+    upper_band, middle_band, lower_band = indicator_engine.bbands(as_float_array(close), length, std)
+    return (
+        pd.Series(upper_band, index=close.index),
+        pd.Series(middle_band, index=close.index),
+        pd.Series(lower_band, index=close.index)
+    )
 
 def calculate_rsi(close, length=14):
-    delta = close.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=length).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=length).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    return pd.Series(indicator_engine.rsi(as_float_array(close), length), index=close.index)
 
 def calculate_macd(close, fast=12, slow=26, signal=9):
-    ema_fast = close.ewm(span=fast, adjust=False).mean()
-    ema_slow = close.ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
+    macd_line, signal_line, histogram = indicator_engine.macd(as_float_array(close), fast, slow, signal)
+    return (
+        pd.Series(macd_line, index=close.index),
+        pd.Series(signal_line, index=close.index),
+        pd.Series(histogram, index=close.index)
+    )
 
 def calculate_vwap(high, low, close, volume, period=None):
-    typical_price = (high + low + close) / 3
-    if period:
-        # 기간 제한 VWAP
-        return (typical_price * volume).rolling(window=period).sum() / volume.rolling(window=period).sum()
-    else:
-        # 누적 VWAP (기존 방식)
-        return (typical_price * volume).cumsum() / volume.cumsum()
+    # period가 없으면 누적 VWAP (기존 방식), 있으면 기간 제한 VWAP
+    vwap = indicator_engine.vwap(
+        as_float_array(high), as_float_array(low), as_float_array(close), as_float_array(volume), period
+    )
+    return pd.Series(vwap, index=close.index)
 
-def calculate_confidence_metrics(data):
+def calculate_confidence_metrics(data, context=None):
     """신뢰도 계산을 위한 메트릭스"""
     try:
+        context = context or AnalysisContext(data)
+        
         # 거래량 분석
         recent_volume = data['Volume'].tail(5).mean()  # 최근 5일 평균
         historical_volume = data['Volume'].tail(30).mean()  # 30일 평균
         volume_ratio = recent_volume / historical_volume if historical_volume > 0 else 1
         
         # 변동성 분석
-        recent_volatility = data['Close'].pct_change().tail(10).std()  # 최근 10일 변동성
-        historical_volatility = data['Close'].pct_change().tail(60).std()  # 60일 변동성
+        returns = context.returns
+        recent_volatility = returns.tail(10).std()  # 최근 10일 변동성
+        historical_volatility = returns.tail(60).std()  # 60일 변동성
         volatility_ratio = recent_volatility / historical_volatility if historical_volatility > 0 else 1
         
         # 데이터 품질
@@ -261,11 +329,13 @@ def generate_warnings(metrics, data):
     
     return warnings
 
-def calculate_dynamic_thresholds(data):
+def calculate_dynamic_thresholds(data, context=None):
     """종목별 동적 임계값 계산"""
     try:
+        context = context or AnalysisContext(data)
+        
         # RSI 동적 임계값 (최근 90일 기준)
-        rsi_values = calculate_rsi(data['Close']).dropna()
+        rsi_values = context.get('rsi', 14).dropna()
         if len(rsi_values) >= 30:
             rsi_upper = np.percentile(rsi_values.tail(90), 80)  # 상위 20%
             rsi_lower = np.percentile(rsi_values.tail(90), 20)  # 하위 20%
@@ -276,7 +346,7 @@ def calculate_dynamic_thresholds(data):
             rsi_upper, rsi_lower = 70, 30  # 기본값
 
         # 볼린저밴드 동적 기간 (변동성에 따라 조정)
-        volatility = data['Close'].pct_change().tail(30).std()
+        volatility = context.returns.tail(30).std()
         if volatility > 0.03:  # 높은 변동성
             bb_period = 15  # 짧은 기간
             bb_std = 2.2    # 넓은 밴드
@@ -340,23 +410,72 @@ def calculate_dynamic_thresholds(data):
             'vwap': {'period': 20, 'explanation': '표준 기간 (20일)'}
         }
 
-def analyze_multiple_timeframes(ticker, base_period='1y'):
+# 다중 시간대 분석 설정
+MULTI_TIMEFRAMES = {
+    'short': {'period': '1mo', 'interval': '1d', 'name': '단기 (1개월)'},
+    'medium': {'period': '3mo', 'interval': '1d', 'name': '중기 (3개월)'},
+    'long': {'period': '1y', 'interval': '1wk', 'name': '장기 (1년)'}
+}
+
+# 기간 길이 순서 (기준 데이터가 시간대를 포함하는지 판단용)
+# ytd는 연초에는 1mo/3mo보다 짧으므로 순서에 넣지 않습니다 (ytd 기준 데이터는 파생하지 않고 따로 받음).
+RANGE_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+def fetch_timeframe_history(ticker, timeframe_key):
+    """다중 시간대 분석용 개별 시간대 데이터 다운로드"""
+    config = MULTI_TIMEFRAMES[timeframe_key]
+    return provider_history(ticker, period=config['period'], interval=config['interval'], timeout=5)
+
+def can_derive_timeframe(timeframe_key, base_period, base_interval):
+    """기준 데이터(차트 데이터)에서 해당 시간대를 만들 수 있는지 여부"""
+    if not app.config['MULTI_TIMEFRAME_RESAMPLE']:
+        return False
+    config = MULTI_TIMEFRAMES[timeframe_key]
+    # 같은 간격이거나 일봉 → 주봉 리샘플링만 허용
+    if base_interval != config['interval'] and not (base_interval == '1d' and config['interval'] == '1wk'):
+        return False
+    if base_period not in RANGE_ORDER:
+        return False
+    return RANGE_ORDER.index(base_period) >= RANGE_ORDER.index(config['period'])
+
+def timeframes_to_fetch(base_period, base_interval):
+    """기준 데이터로 만들 수 없어 따로 받아야 하는 시간대 목록"""
+    return [key for key in MULTI_TIMEFRAMES if not can_derive_timeframe(key, base_period, base_interval)]
+
+def resample_weekly(data):
+    """일봉을 주봉으로 변환 (yfinance 주봉과 같은 월요일 시작 기준)"""
+    aggregations = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    aggregations = {column: how for column, how in aggregations.items() if column in data.columns}
+    weekly = data.resample('W-MON', label='left', closed='left').agg(aggregations)
+    return weekly.dropna(subset=['Close'])
+
+def derive_timeframe_data(base_data, timeframe_key, base_interval):
+    """기준 데이터를 잘라내고 필요하면 주봉으로 리샘플링해 시간대 데이터를 만듭니다."""
+    config = MULTI_TIMEFRAMES[timeframe_key]
+    data = slice_period(base_data, config['period'])
+    if base_interval == '1d' and config['interval'] == '1wk':
+        data = resample_weekly(data)
+    return data
+
+def analyze_multiple_timeframes(ticker, base_period='1y', timeframe_data=None, base_data=None, base_interval='1d'):
     """
     다중 시간대 분석 - 단기, 중기, 장기 신호 일치도 확인
+    timeframe_data: 미리 받아 둔 시간대별 데이터 (None이면 직접 다운로드)
+    base_data: 이미 받은 차트 데이터 (포함 가능한 시간대는 다운로드 없이 파생)
     """
     try:
-        timeframes = {
-            'short': {'period': '1mo', 'interval': '1d', 'name': '단기 (1개월)'},
-            'medium': {'period': '3mo', 'interval': '1d', 'name': '중기 (3개월)'},
-            'long': {'period': '1y', 'interval': '1wk', 'name': '장기 (1년)'}
-        }
-        
         results = {}
-        stock = yf.Ticker(ticker)
         
-        for timeframe_key, config in timeframes.items():
+        for timeframe_key, config in MULTI_TIMEFRAMES.items():
             try:
-                data = stock.history(period=config['period'], interval=config['interval'], timeout=5)
+                if base_data is not None and can_derive_timeframe(timeframe_key, base_period, base_interval):
+                    data = derive_timeframe_data(base_data, timeframe_key, base_interval)
+                elif timeframe_data is not None:
+                    data = timeframe_data.get(timeframe_key)
+                    if data is None:
+                        continue
+                else:
+                    data = fetch_timeframe_history(ticker, timeframe_key)
                 if data.empty or len(data) < 10:
                     continue
                     
@@ -462,12 +581,16 @@ def analyze_multiple_timeframes(ticker, base_period='1y'):
             'total_timeframes': 0
         }
 
-def calculate_risk_metrics(data, market_data=None):
+RISK_FREE_RATE = 0.025  # 2.5% 무위험 수익률 (한국 국채 3년물 기준)
+
+def calculate_risk_metrics(data, market_data=None, context=None, beta=None):
     """
     리스크 지표 계산 (MDD, 샤프비율, 베타)
+    beta: 종목군 행렬에서 읽은 베타 (주어지면 market_data로 다시 계산하지 않음)
     """
     try:
-        returns = data['Close'].pct_change().dropna()
+        context = context or AnalysisContext(data)
+        returns = context.returns.dropna()
         
         # 1. Maximum Drawdown (MDD) 계산
         cumulative = (1 + returns).cumprod()
@@ -476,18 +599,16 @@ def calculate_risk_metrics(data, market_data=None):
         mdd = float(drawdown.min() * 100)  # 백분율
         
         # 2. 샤프 비율 계산 (연율화)
-        risk_free_rate = 0.025  # 2.5% 무위험 수익률 (한국 국채 3년물 기준)
         annual_return = float(returns.mean() * 252)
         annual_volatility = float(returns.std() * np.sqrt(252))
         
         if annual_volatility > 0:
-            sharpe_ratio = (annual_return - risk_free_rate) / annual_volatility
+            sharpe_ratio = (annual_return - RISK_FREE_RATE) / annual_volatility
         else:
             sharpe_ratio = 0
             
-        # 3. 베타 계산 (KOSPI 대비, 시장 데이터가 있는 경우)
-        beta = None
-        if market_data is not None and len(market_data) > 0:
+        # 3. 베타 계산 (벤치마크 지수 대비, 시장 데이터가 있는 경우)
+        if beta is None and market_data is not None and len(market_data) > 0:
             try:
                 market_returns = market_data['Close'].pct_change().dropna()
                 # 공통 기간 맞추기
@@ -531,25 +652,90 @@ def calculate_risk_metrics(data, market_data=None):
             'annual_return': None
         }
 
-def backtest_signals(data, dynamic_thresholds, lookback_days=30):
+def calculate_portfolio_metrics(returns, weights, confidence_levels=(0.95, 0.99)):
+    """
+    포트폴리오 리스크 지표 (calculate_risk_metrics와 같은 연율화/샤프 정의)
+    returns: (날짜 × 종목) 일간 수익률 배열 (거래하지 않은 날은 0)
+    weights: 합이 1인 비중 배열
+    - 변동성, MDD, 샤프비율, 연 수익률
+    - 과거 수익률 분포 기준 VaR / CVaR (1일, 손실을 양수 %로)
+    - 종목별 위험 기여도 (포트폴리오 분산 중 종목 몫의 비율 %, 합이 100)
+    """
+    portfolio = returns @ weights
+    
+    cumulative = np.cumprod(1 + portfolio)
+    running_max = np.maximum.accumulate(cumulative)
+    mdd = float(((cumulative - running_max) / running_max).min() * 100)
+    
+    annual_return = float(portfolio.mean() * 252)
+    annual_volatility = float(portfolio.std(ddof=1) * np.sqrt(252))
+    sharpe_ratio = (annual_return - RISK_FREE_RATE) / annual_volatility if annual_volatility > 0 else 0
+    
+    value_at_risk = {}
+    for level in confidence_levels:
+        cutoff = np.quantile(portfolio, 1 - level)
+        tail = portfolio[portfolio <= cutoff]
+        value_at_risk[f"{int(level * 100)}"] = {
+            'var': round(float(-cutoff * 100), 2),
+            'cvar': round(float(-tail.mean() * 100), 2)
+        }
+    
+    # 위험 기여도 비율: w_i * (Σw)_i / σ_p² (변동성 기여도 w_i * (Σw)_i / σ_p를 σ_p로 나눈 값)
+    covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+    portfolio_variance = float(weights @ covariance @ weights)
+    contributions = np.zeros(len(weights))
+    if portfolio_variance > 0:
+        contributions = weights * (covariance @ weights) / portfolio_variance
+    asset_volatility = np.sqrt(np.diag(covariance) * 252) * 100
+    
+    return {
+        'mdd': round(mdd, 2),
+        'sharpe_ratio': round(sharpe_ratio, 3),
+        'volatility': round(annual_volatility * 100, 2),
+        'annual_return': round(annual_return * 100, 2),
+        'value_at_risk': value_at_risk,
+        'positions': [
+            {
+                'weight': round(float(weight), 4),
+                'volatility': round(float(volatility), 2),
+                'risk_contribution': round(float(contribution * 100), 2)
+            }
+            for weight, volatility, contribution in zip(weights, asset_volatility, contributions)
+        ]
+    }
+
+# 백테스트 기본 설정: 지표별 보유 기간(봉 수)과 시험 구간 안에서 신호 평가를 시작하는 위치
+BACKTEST_HOLDING_PERIODS = {'rsi': 5, 'macd': 3, 'bollinger': 3, 'vwap': 2}
+BACKTEST_START_OFFSETS = {'rsi': 20, 'macd': 30, 'bollinger': 25, 'vwap': 25}
+BACKTEST_WARMUP = 20  # 지표 계산을 위해 시험 구간 앞에 두는 여유 봉 수
+
+EMPTY_BACKTEST_RESULT = {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
+
+def backtest_signals(data, dynamic_thresholds, lookback_days=30, context=None, holding_periods=None):
     """
     지표별 신호의 과거 성과를 백테스팅
-    lookback_days: 백테스팅할 기간 (일)
+    lookback_days: 백테스팅할 기간 (일, None이면 전체 기간)
+    context: 요청 단위 분석 컨텍스트 (지표를 다른 단계와 공유)
+    holding_periods: 지표별 보유 기간 (봉 수, 기본값 BACKTEST_HOLDING_PERIODS)
     """
     try:
-        if len(data) < lookback_days + 20:  # 최소 데이터 요구사항
+        required = (lookback_days or 0) + BACKTEST_WARMUP
+        if len(data) < required:  # 최소 데이터 요구사항
             return {}
         
         results = {}
+        holding = {**BACKTEST_HOLDING_PERIODS, **(holding_periods or {})}
         
-        # 백테스팅용 데이터 준비
-        test_data = data.tail(lookback_days + 20).copy()  # 지표 계산을 위해 여유분 추가
+        # 백테스팅용 데이터 준비 (지표 계산을 위해 여유분 추가)
+        context = context or AnalysisContext(data)
+        test_context = context.tail(required) if lookback_days else context
+        test_data = test_context.data
         
         # 각 지표별 백테스팅
-        results['rsi'] = backtest_rsi_signals(test_data, dynamic_thresholds)
-        results['macd'] = backtest_macd_signals(test_data, dynamic_thresholds)
-        results['bollinger'] = backtest_bollinger_signals(test_data, dynamic_thresholds)
-        results['vwap'] = backtest_vwap_signals(test_data, dynamic_thresholds)
+        results['rsi'] = backtest_rsi_signals(test_data, dynamic_thresholds, test_context, holding['rsi'])
+        results['macd'] = backtest_macd_signals(test_data, dynamic_thresholds, test_context, holding['macd'])
+        results['bollinger'] = backtest_bollinger_signals(test_data, dynamic_thresholds, test_context, holding['bollinger'])
+        results['vwap'] = backtest_vwap_signals(test_data, dynamic_thresholds, test_context, holding['vwap'])
         
         return results
         
@@ -557,193 +743,121 @@ def backtest_signals(data, dynamic_thresholds, lookback_days=30):
         logging.warning(f"Error in backtest_signals: {e}")
         return {}
 
-def backtest_rsi_signals(data, thresholds):
-    """RSI 신호 백테스팅"""
+def signal_returns(close, long_mask, short_mask, holding_period, start):
+    """
+    신호 봉에서 holding_period 봉 후까지의 수익률 (매수는 상승, 매도는 하락이 수익)
+    start 이전 봉과 보유 기간을 채우지 못하는 마지막 봉들은 제외합니다.
+    """
+    end = len(close) - holding_period
+    if end <= start:
+        return np.empty(0)
+    price = close[start:end]
+    forward = (close[start + holding_period:] - price) / price
+    longs = long_mask[start:end]
+    shorts = short_mask[start:end] & ~longs
+    signals = longs | shorts
+    return np.where(longs, forward, -forward)[signals]
+
+def summarize_backtest(returns, holding_period):
+    """신호 수익률 배열 → 정확도/평균 수익률/승률"""
+    if len(returns) == 0:
+        return dict(EMPTY_BACKTEST_RESULT)
+    
+    accuracy = int(np.count_nonzero(returns > 0)) / len(returns) * 100
+    avg_return = float(returns.sum()) / len(returns) * 100
+    
+    return {
+        'accuracy': round(accuracy, 1),
+        'avg_return': round(avg_return, 2),
+        'total_signals': int(len(returns)),
+        'win_rate': round(accuracy, 1),
+        'period_days': holding_period
+    }
+
+def backtest_rsi_signals(data, thresholds, context=None, holding_period=BACKTEST_HOLDING_PERIODS['rsi']):
+    """RSI 신호 백테스팅 (과매수 매도 / 과매도 매수)"""
     try:
-        rsi = calculate_rsi(data['Close'])
+        context = context or AnalysisContext(data)
+        rsi = context.get('rsi', 14).to_numpy()
         upper_threshold = thresholds.get('rsi', {}).get('upper_threshold', 70)
         lower_threshold = thresholds.get('rsi', {}).get('lower_threshold', 30)
         
-        signals = []
-        returns = []
-        
-        for i in range(20, len(data) - 5):  # 신호 발생 후 5일 수익률 측정
-            current_rsi = rsi.iloc[i]
-            if pd.isna(current_rsi):
-                continue
-                
-            current_price = data['Close'].iloc[i]
-            future_price = data['Close'].iloc[i + 5]  # 5일 후 가격
-            
-            if current_rsi > upper_threshold:  # 과매수 신호 (매도)
-                signals.append('sell')
-                returns.append((current_price - future_price) / current_price)  # 매도 수익률
-            elif current_rsi < lower_threshold:  # 과매도 신호 (매수)
-                signals.append('buy')
-                returns.append((future_price - current_price) / current_price)  # 매수 수익률
-        
-        if not returns:
-            return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
-        
-        positive_returns = [r for r in returns if r > 0]
-        accuracy = len(positive_returns) / len(returns) * 100
-        avg_return = sum(returns) / len(returns) * 100
-        win_rate = len(positive_returns) / len(returns) * 100
-        
-        return {
-            'accuracy': round(accuracy, 1),
-            'avg_return': round(avg_return, 2),
-            'total_signals': len(returns),
-            'win_rate': round(win_rate, 1),
-            'period_days': 5
-        }
+        sell = rsi > upper_threshold
+        buy = (rsi < lower_threshold) & ~sell
+        returns = signal_returns(context.get('array', 'Close'), buy, sell, holding_period, BACKTEST_START_OFFSETS['rsi'])
+        return summarize_backtest(returns, holding_period)
         
     except Exception as e:
         logging.warning(f"Error in backtest_rsi_signals: {e}")
-        return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
+        return dict(EMPTY_BACKTEST_RESULT)
 
-def backtest_macd_signals(data, thresholds):
-    """MACD 신호 백테스팅"""
+def backtest_macd_signals(data, thresholds, context=None, holding_period=BACKTEST_HOLDING_PERIODS['macd']):
+    """MACD 신호 백테스팅 (골든 크로스 매수 / 데드 크로스 매도)"""
     try:
+        context = context or AnalysisContext(data)
         macd_params = thresholds.get('macd', {})
-        macd_line, macd_signal, _ = calculate_macd(
-            data['Close'],
-            fast=macd_params.get('fast', 12),
-            slow=macd_params.get('slow', 26),
-            signal=macd_params.get('signal', 9)
+        macd_line, macd_signal, _ = context.get(
+            'macd',
+            macd_params.get('fast', 12),
+            macd_params.get('slow', 26),
+            macd_params.get('signal', 9)
         )
+        macd_line, macd_signal = macd_line.to_numpy(), macd_signal.to_numpy()
         
-        signals = []
-        returns = []
+        # 직전 봉과 비교한 교차 (NaN이 섞인 봉은 비교 결과가 False)
+        golden_cross = np.zeros(len(macd_line), dtype=bool)
+        dead_cross = np.zeros(len(macd_line), dtype=bool)
+        golden_cross[1:] = (macd_line[:-1] <= macd_signal[:-1]) & (macd_line[1:] > macd_signal[1:])
+        dead_cross[1:] = (macd_line[:-1] >= macd_signal[:-1]) & (macd_line[1:] < macd_signal[1:])
         
-        for i in range(30, len(data) - 3):  # MACD는 더 많은 초기 데이터 필요
-            prev_macd = macd_line.iloc[i-1]
-            curr_macd = macd_line.iloc[i]
-            prev_signal = macd_signal.iloc[i-1]
-            curr_signal = macd_signal.iloc[i]
-            
-            if pd.isna(prev_macd) or pd.isna(curr_macd) or pd.isna(prev_signal) or pd.isna(curr_signal):
-                continue
-            
-            current_price = data['Close'].iloc[i]
-            future_price = data['Close'].iloc[i + 3]  # 3일 후 가격
-            
-            # 골든 크로스 (매수 신호)
-            if prev_macd <= prev_signal and curr_macd > curr_signal:
-                signals.append('buy')
-                returns.append((future_price - current_price) / current_price)
-            # 데드 크로스 (매도 신호)
-            elif prev_macd >= prev_signal and curr_macd < curr_signal:
-                signals.append('sell')
-                returns.append((current_price - future_price) / current_price)
-        
-        if not returns:
-            return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
-        
-        positive_returns = [r for r in returns if r > 0]
-        accuracy = len(positive_returns) / len(returns) * 100
-        avg_return = sum(returns) / len(returns) * 100
-        
-        return {
-            'accuracy': round(accuracy, 1),
-            'avg_return': round(avg_return, 2),
-            'total_signals': len(returns),
-            'win_rate': round(accuracy, 1),
-            'period_days': 3
-        }
+        returns = signal_returns(
+            context.get('array', 'Close'), golden_cross, dead_cross, holding_period, BACKTEST_START_OFFSETS['macd']
+        )
+        return summarize_backtest(returns, holding_period)
         
     except Exception as e:
         logging.warning(f"Error in backtest_macd_signals: {e}")
-        return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
+        return dict(EMPTY_BACKTEST_RESULT)
 
-def backtest_bollinger_signals(data, thresholds):
-    """볼린저밴드 신호 백테스팅"""
+def backtest_bollinger_signals(data, thresholds, context=None, holding_period=BACKTEST_HOLDING_PERIODS['bollinger']):
+    """볼린저밴드 신호 백테스팅 (밴드 이탈 시 매수)"""
     try:
+        context = context or AnalysisContext(data)
         bb_params = thresholds.get('bollinger', {})
-        upper, middle, lower = calculate_bbands(
-            data['Close'],
-            length=bb_params.get('period', 20),
-            std=bb_params.get('std_dev', 2.0)
+        upper, middle, lower = context.get(
+            'bbands',
+            bb_params.get('period', 20),
+            bb_params.get('std_dev', 2.0)
         )
+        upper, lower = upper.to_numpy(), lower.to_numpy()
+        close = context.get('array', 'Close')
         
-        returns = []
-        
-        for i in range(25, len(data) - 3):
-            current_price = data['Close'].iloc[i]
-            future_price = data['Close'].iloc[i + 3]
-            
-            upper_val = upper.iloc[i]
-            lower_val = lower.iloc[i]
-            
-            if pd.isna(upper_val) or pd.isna(lower_val):
-                continue
-            
-            # 상단 돌파 (매수 신호) - 단순히 돌파만으로는 위험하므로 조건 완화
-            if current_price > upper_val:
-                returns.append((future_price - current_price) / current_price)
-            # 하단 이탈 (매수 기회)
-            elif current_price < lower_val:
-                returns.append((future_price - current_price) / current_price)
-        
-        if not returns:
-            return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
-        
-        positive_returns = [r for r in returns if r > 0]
-        accuracy = len(positive_returns) / len(returns) * 100
-        avg_return = sum(returns) / len(returns) * 100
-        
-        return {
-            'accuracy': round(accuracy, 1),
-            'avg_return': round(avg_return, 2),
-            'total_signals': len(returns),
-            'win_rate': round(accuracy, 1),
-            'period_days': 3
-        }
+        # 상단 돌파 또는 하단 이탈 (밴드가 계산된 봉만)
+        valid = ~np.isnan(upper) & ~np.isnan(lower)
+        buy = valid & ((close > upper) | (close < lower))
+        returns = signal_returns(close, buy, np.zeros_like(buy), holding_period, BACKTEST_START_OFFSETS['bollinger'])
+        return summarize_backtest(returns, holding_period)
         
     except Exception as e:
         logging.warning(f"Error in backtest_bollinger_signals: {e}")
-        return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
+        return dict(EMPTY_BACKTEST_RESULT)
 
-def backtest_vwap_signals(data, thresholds):
-    """VWAP 신호 백테스팅"""
+def backtest_vwap_signals(data, thresholds, context=None, holding_period=BACKTEST_HOLDING_PERIODS['vwap']):
+    """VWAP 신호 백테스팅 (VWAP 위 매수 / 아래 매도)"""
     try:
+        context = context or AnalysisContext(data)
         vwap_period = thresholds.get('vwap', {}).get('period', 20)
-        vwap = calculate_vwap(data['High'], data['Low'], data['Close'], data['Volume'], period=vwap_period)
-        
-        returns = []
+        vwap = context.get('vwap', vwap_period).to_numpy()
+        close = context.get('array', 'Close')
         
-        for i in range(25, len(data) - 2):
-            current_price = data['Close'].iloc[i]
-            future_price = data['Close'].iloc[i + 2]  # 2일 후
-            current_vwap = vwap.iloc[i]
-            
-            if pd.isna(current_vwap):
-                continue
-            
-            # VWAP 위/아래 기준 신호
-            if current_price > current_vwap:  # VWAP 위 (매수 신호)
-                returns.append((future_price - current_price) / current_price)
-            elif current_price < current_vwap:  # VWAP 아래 (매도 또는 관망)
-                returns.append((current_price - future_price) / current_price)
-        
-        if not returns:
-            return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
-        
-        positive_returns = [r for r in returns if r > 0]
-        accuracy = len(positive_returns) / len(returns) * 100
-        avg_return = sum(returns) / len(returns) * 100
-        
-        return {
-            'accuracy': round(accuracy, 1),
-            'avg_return': round(avg_return, 2),
-            'total_signals': len(returns),
-            'win_rate': round(accuracy, 1),
-            'period_days': 2
-        }
+        returns = signal_returns(
+            close, close > vwap, close < vwap, holding_period, BACKTEST_START_OFFSETS['vwap']
+        )
+        return summarize_backtest(returns, holding_period)
         
     except Exception as e:
         logging.warning(f"Error in backtest_vwap_signals: {e}")
-        return {'accuracy': 0, 'avg_return': 0, 'total_signals': 0, 'win_rate': 0}
+        return dict(EMPTY_BACKTEST_RESULT)
 
 
 # --- 에러 핸들링 데코레이터 ---
@@ -802,18 +916,679 @@ def validate_ticker(ticker):
     
     return ticker.upper()
 
+# --- 종목 마스터 (KRX / NASDAQ / S&P 500 목록) ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_symbol_master = None
+_symbol_master_lock = threading.Lock()
+
+def load_symbol_master():
+    """
+    종목 목록 CSV로 심볼 → 시장 정보 매핑 생성
+    KRX는 6자리 코드, 미국 종목은 yfinance 심볼을 키로 사용합니다.
+    """
+    master = {'krx': {}, 'us': {}}
+    
+    def read_list(filename):
+        path = os.path.join(BASE_DIR, filename)
+        if not os.path.exists(path):
+            logging.warning(f"Symbol list not found: {filename}")
+            return pd.DataFrame()
+        return pd.read_csv(path, dtype=str, encoding='utf-8-sig').fillna('')
+    
+    krx = read_list('krx_stock_list.csv')
+    if not krx.empty:
+        for symbol, name, market in zip(krx['Symbol'], krx['Name'], krx['Market']):
+            master['krx'][symbol.zfill(6)] = {'market': market, 'name': name}
+    
+    nasdaq = read_list('nasdaq_stock_list.csv')
+    if not nasdaq.empty:
+        for symbol, name in zip(nasdaq['Symbol'], nasdaq['Company Name']):
+            master['us'][symbol.upper()] = {'market': 'NASDAQ', 'name': name}
+    
+    # S&P 500은 NASDAQ 상장 종목이라도 S&P 500 정보(섹터 포함)를 우선합니다.
+    sp500 = read_list('sp500_stock_list.csv')
+    if not sp500.empty:
+        for symbol, name, sector in zip(sp500['Symbol_yfinance'], sp500['Company Name'], sp500['Sector']):
+            master['us'][symbol.upper()] = {'market': 'S&P 500', 'name': name, 'sector': sector}
+    
+    return master
+
+def get_symbol_master():
+    """프로세스 전역 종목 마스터 (최초 1회 로드)"""
+    global _symbol_master
+    if _symbol_master is None:
+        with _symbol_master_lock:
+            if _symbol_master is None:
+                _symbol_master = load_symbol_master()
+    return _symbol_master
+
+def lookup_symbol(ticker):
+    """종목 마스터에서 티커 정보 조회 (없으면 None)"""
+    master = get_symbol_master()
+    code, _, suffix = ticker.upper().partition('.')
+    if suffix in ('KS', 'KQ'):
+        return master['krx'].get(code)
+    return master['us'].get(ticker.upper())
+
+
+# --- 벤치마크 지수 캐시 ---
+MARKET_BENCHMARKS = {'KOSPI': '^KS11', 'KOSDAQ': '^KQ11', 'S&P 500': '^GSPC', 'NASDAQ': '^IXIC'}
+BENCHMARK_NAMES = {'^KS11': 'KOSPI', '^KQ11': 'KOSDAQ', '^GSPC': 'S&P 500', '^IXIC': 'NASDAQ'}
+
+# 지수별 거래소 시간대와 장 마감 시각 (세션 단위 갱신 기준)
+BENCHMARK_SESSIONS = {
+    '^KS11': ('Asia/Seoul', datetime.time(15, 30)),
+    '^KQ11': ('Asia/Seoul', datetime.time(15, 30)),
+    '^GSPC': ('America/New_York', datetime.time(16, 0)),
+    '^IXIC': ('America/New_York', datetime.time(16, 0)),
+}
+BENCHMARK_SESSION_OPENS = {
+    '^KS11': datetime.time(9, 0),
+    '^KQ11': datetime.time(9, 0),
+    '^GSPC': datetime.time(9, 30),
+    '^IXIC': datetime.time(9, 30),
+}
+
+_benchmark_cache = {}
+_benchmark_locks = {}
+_benchmark_guard = threading.Lock()
+
+def select_benchmark(ticker):
+    """종목 시장에 맞는 벤치마크 지수 선택"""
+    entry = lookup_symbol(ticker)
+    if entry and entry['market'] in MARKET_BENCHMARKS:
+        return MARKET_BENCHMARKS[entry['market']]
+    if ticker.upper().endswith('.KQ'):
+        return '^KQ11'
+    if ticker.upper().endswith('.KS'):
+        return '^KS11'
+    return '^GSPC'
+
+def last_session_close(benchmark, now=None):
+    """가장 최근에 마감된 거래 세션의 마감 시각 (주말 제외)"""
+    tz, close_time = BENCHMARK_SESSIONS[benchmark]
+    now = now or pd.Timestamp.now(tz=tz)
+    session_close = pd.Timestamp.combine(now.date(), close_time).tz_localize(tz)
+    if now < session_close:
+        session_close -= pd.Timedelta(days=1)
+    while session_close.weekday() >= 5:
+        session_close -= pd.Timedelta(days=1)
+    return session_close
+
+def next_session_open(benchmark, after):
+    """after 이후 처음 시작하는 거래 세션의 개장 시각 (주말 제외)"""
+    tz, _ = BENCHMARK_SESSIONS[benchmark]
+    after = after.tz_convert(tz)
+    session_open = pd.Timestamp.combine(after.date(), BENCHMARK_SESSION_OPENS[benchmark]).tz_localize(tz)
+    if session_open <= after:
+        session_open += pd.Timedelta(days=1)
+    while session_open.weekday() >= 5:
+        session_open += pd.Timedelta(days=1)
+    return session_open
+
+def get_benchmark_history(benchmark, data_range, interval):
+    """
+    벤치마크 지수 시계열 (프로세스 전역 캐시)
+    일봉 이상은 마지막 장 마감 이후 한 번만, 분봉/시간봉은 다음 봉이 시작되면 다시 받습니다.
+    (장중 분봉 지수를 하루 종일 재사용하면 종목 봉과 겹치는 구간이 늘지 않아 베타가 계산되지 않음)
+    """
+    key = (benchmark, data_range, interval)
+    session = last_session_close(benchmark)
+    
+    with _benchmark_guard:
+        lock = _benchmark_locks.setdefault(key, threading.Lock())
+    
+    with lock:
+        cached = _benchmark_cache.get(key)
+        if cached is not None and cached['session'] >= session and time.time() < cached['expires']:
+            return cached['data']
+        
+        market_data = bar_store.get_history(benchmark, data_range, interval, timeout=5)
+        if market_data.empty:
+            return None
+        next_bar = seconds_to_next_bar(interval)
+        expires = time.time() + next_bar if next_bar is not None else float('inf')
+        _benchmark_cache[key] = {'data': market_data, 'session': session, 'expires': expires}
+        return market_data
+
+
+def lookup_matrix_beta(ticker, benchmark, data_range, interval):
+    """
+    종목군 행렬에 저장된 베타 (행렬과 같은 기간의 일봉 요청만, 오래된 행렬은 사용하지 않음)
+    """
+    if data_range != app.config['RISK_MATRIX_PERIOD'] or interval != '1d':
+        return None
+    for matrix in risk_matrices.values():
+        meta = matrix.meta() if matrix.exists() else None
+        if meta is None:
+            continue
+        age = (pd.Timestamp.now(tz='UTC') - pd.Timestamp(meta['built_at'])).total_seconds()
+        if age > app.config['RISK_MATRIX_MAX_AGE']:
+            continue
+        beta = matrix.beta(ticker, benchmark)
+        if beta is not None:
+            return beta
+    return None
+
+
+# --- 업스트림 데이터 요청 ---
+def fetch_price_history(ticker, data_range, interval):
+    """종목 시세 다운로드 (재시도/서킷 브레이커는 공급자 래퍼에서 처리)"""
+    return bar_store.get_history(ticker, data_range, interval, timeout=app.config['API_TIMEOUT'])
+
+def compute_stored_indicators(ticker, interval, data, params):
+    """
+    바 저장소의 전체 시계열로 지표를 계산(저장된 상태 재사용)한 뒤 data 구간만 잘라 반환
+    기간을 바꾸거나 기간이 하루씩 밀려도 같은 상태를 이어 씁니다.
+    저장 대상 간격이 아니거나 저장본이 data로 끝나지 않으면 None (호출하는 쪽에서 직접 계산)
+    """
+    full = bar_store.stored(ticker, interval) if interval in bar_store.intervals else None
+    if full is None or len(full) < len(data):
+        return None
+    start = len(full) - len(data)
+    if not full.index[start:].equals(data.index):
+        return None
+    indicators = indicator_states.compute((ticker, interval), full, params)
+    return {name: values[start:] for name, values in indicators.items()}
+
+def fetch_market_history(ticker, data_range, interval):
+    """종목 시장에 맞는 벤치마크 지수 데이터 (베타 계산용, 세션 단위 캐시)"""
+    return get_benchmark_history(select_benchmark(ticker), data_range, interval)
+
+def collect_optional(future, deadline, label):
+    """
+    선택 섹션용 결과 수집 - 마감 시간을 넘기거나 실패하면 None
+    """
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except TimeoutError:
+        future.cancel()
+        logging.warning(f"{label} fetch missed the request deadline")
+    except Exception as e:
+        logging.warning(f"{label} fetch failed: {e}")
+    return None
+
+
+# --- 응답 캐시 ---
+INTRADAY_INTERVALS = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h']
+# 분봉/시간봉 길이 (초) - 브라우저 캐시 만료를 다음 봉 시작에 맞춤
+BAR_SECONDS = {'1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '90m': 5400, '1h': 3600}
+
+_response_cache_stats = {}
+_response_cache_stats_lock = threading.Lock()
+
+def record_cache_event(endpoint, event):
+    """엔드포인트별 캐시 적중/실패 횟수 기록"""
+    with _response_cache_stats_lock:
+        stats = _response_cache_stats.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        stats[event] += 1
+
+def response_cache_key(endpoint):
+    """
+    정규화된 (endpoint, ticker, range, interval) 캐시 키
+    티커 형식이 잘못된 요청은 캐시하지 않습니다 (None 반환).
+    """
+    try:
+        ticker = validate_ticker(request.args.get('ticker'))
+    except ValueError:
+        return None, None
+    
+    if endpoint == 'stock':
+        data_range = request.args.get('range', '1y')
+        interval = request.args.get('interval', '1d')
+        response_format = request.args.get('format', 'json')
+        key = f"response:{endpoint}:{ticker}:{data_range}:{interval}"
+        if response_format != 'json':
+            key += f":{response_format}"
+        if request.args.get('since'):
+            # 증분 응답은 같은 마지막 봉을 가진 클라이언트끼리 공유
+            key += f":since={request.args.get('since')}"
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError:
+            return None, None  # 뷰에서 400 처리
+        if len(fields) < len(STOCK_FIELDS):
+            # 순서/중복과 무관하게 같은 선택이면 같은 키
+            key += f":fields={','.join(sorted(fields))}"
+        return key, interval
+    elif endpoint == 'sweep':
+        # 그리드/보유 기간 등 나머지 파라미터도 키에 포함
+        data_range = request.args.get('range', '1y')
+        interval = request.args.get('interval', '1d')
+        options = '&'.join(
+            f"{name}={value}" for name, value in sorted(request.args.items())
+            if name not in ('ticker', 'range', 'interval')
+        )
+        return f"response:{endpoint}:{ticker}:{data_range}:{interval}:{options}", interval
+    else:
+        data_range = interval = None
+    return f"response:{endpoint}:{ticker}:{data_range}:{interval}", interval
+
+def response_cache_ttl(interval):
+    """간격별 캐시 유지 시간 (분봉은 짧게, 일봉/주봉은 길게)"""
+    ttls = app.config['RESPONSE_CACHE_TTLS']
+    if interval is None:
+        return ttls['info']
+    if interval in INTRADAY_INTERVALS:
+        return ttls['intraday']
+    if interval == '1d':
+        return ttls['daily']
+    return ttls['weekly']
+
+# 만료된 캐시 항목의 백그라운드 갱신 (동시 갱신 수 제한)
+refresh_executor = ThreadPoolExecutor(
+    max_workers=app.config['RESPONSE_REFRESH_MAX_WORKERS'],
+    thread_name_prefix='refresh'
+)
+_refreshing_keys = set()
+_refreshing_lock = threading.Lock()
+
+# 진행 중인 동일 요청 (키 → Future)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def single_flight(key, fn):
+    """
+    같은 키의 동시 요청은 먼저 시작한 요청의 결과를 함께 기다립니다.
+    예외도 그대로 공유하므로 실패한 업스트림 호출이 대기 중인 요청 수만큼 반복되지 않습니다.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+    
+    if not is_leader:
+        return future.result()
+    
+    try:
+        result = fn()
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def entry_from_response(response, ttl):
+    """
+    응답 객체를 요청 간에 공유 가능한 캐시 항목으로 변환
+    성공 응답은 압축해서 보관하므로 캐시 적중 시 압축 비용이 없습니다. (gzip + brotli 설치 시 brotli)
+    """
+    body = response.get_data()
+    entry = {
+        'body': body,
+        'status': response.status_code,
+        'mimetype': response.mimetype,
+        'created': time.time(),
+        'ttl': ttl,
+        'encoding': None
+    }
+    if response.status_code == 200:
+        entry['etag'] = content_etag(body)
+        entry['body'] = gzip.compress(body, compresslevel=app.config['RESPONSE_GZIP_LEVEL'], mtime=0)
+        entry['encoding'] = 'gzip'
+        if brotli is not None and app.config['RESPONSE_BROTLI_QUALITY'] is not None:
+            entry['brotli'] = brotli.compress(body, quality=app.config['RESPONSE_BROTLI_QUALITY'])
+    return entry
+
+def compute_response(key, interval, f, *args, **kwargs):
+    """
+    뷰 함수를 실행해 캐시 항목을 만들고 성공 응답은 저장
+    유지 시간 + 최대 허용 지연 시간 동안 보관해 만료 직후에도 즉시 응답할 수 있게 합니다.
+    """
+    response = make_response(f(*args, **kwargs))
+    if response.status_code == 404:
+        # 부정 캐시: 없는 종목/데이터는 짧게 따로 보관 (지연 응답 없음)
+        entry = entry_from_response(response, app.config['NEGATIVE_CACHE_TTL'])
+        cache.set(key, entry, timeout=entry['ttl'])
+        return entry
+    
+    ttl = response_cache_ttl(interval)
+    entry = entry_from_response(response, ttl)
+    if entry['status'] == 200:
+        cache.set(key, entry, timeout=ttl + app.config['RESPONSE_CACHE_MAX_STALENESS'])
+    return entry
+
+def seconds_to_next_bar(interval, now=None):
+    """분봉/시간봉의 다음 봉 시작까지 남은 시간 (초, 일봉 이상은 None)"""
+    step = BAR_SECONDS.get(interval)
+    if step is None:
+        return None
+    now = time.time() if now is None else now
+    return step - int(now) % step
+
+def client_max_age(remaining, interval):
+    """브라우저 캐시 유지 시간: 서버 캐시 남은 시간과 다음 봉 시작 중 빠른 쪽"""
+    max_age = max(0, int(remaining))
+    next_bar = seconds_to_next_bar(interval)
+    return max_age if next_bar is None else min(max_age, next_bar)
+
+def conditional_response(etag, max_age, build):
+    """
+    ETag / Cache-Control 조건부 응답
+    If-None-Match가 같은 내용을 가리키면 본문 없이 304, 아니면 build()로 만든 응답
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = build()
+    # 압축 방식과 무관하게 같은 내용이므로 약한 ETag
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = f"public, max-age={max_age}"
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+def response_from_entry(entry, cache_status, interval=None):
+    """캐시 항목으로 응답 객체 생성 (성공 응답은 조건부 GET 처리)"""
+    if entry.get('encoding') != 'gzip':
+        response = make_response(entry['body'], entry['status'])
+        response.mimetype = entry['mimetype']
+    else:
+        remaining = entry['created'] + entry['ttl'] - time.time()
+        response = conditional_response(
+            entry['etag'], client_max_age(remaining, interval),
+            lambda: precompressed_response(entry['body'], entry['mimetype'], entry.get('brotli'))
+        )
+    response.headers['X-Cache'] = cache_status
+    return response
+
+def schedule_refresh(key, interval, f, path, query_string):
+    """만료된 항목을 백그라운드에서 다시 계산 (같은 키 중복 갱신 및 동시 갱신 수 초과 시 생략)"""
+    with _refreshing_lock:
+        if key in _refreshing_keys or len(_refreshing_keys) >= app.config['RESPONSE_REFRESH_MAX_WORKERS']:
+            return
+        _refreshing_keys.add(key)
+    
+    def refresh():
+        try:
+            with app.test_request_context(path, query_string=query_string):
+                single_flight(key, lambda: compute_response(key, interval, f))
+        except Exception as e:
+            logging.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing_keys.discard(key)
+    
+    refresh_executor.submit(refresh)
+
+def cached_response(endpoint):
+    """
+    요청 파라미터 기반 응답 캐시 데코레이터 (성공 응답만 저장)
+    유지 시간이 지난 항목은 최대 허용 지연 시간까지 그대로 응답하고 백그라운드에서 갱신합니다.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key, interval = response_cache_key(endpoint)
+            if key is None:
+                return f(*args, **kwargs)
+            
+            entry = cache.get(key)
+            if entry is not None:
+                age = time.time() - entry['created']
+                if age <= entry['ttl']:
+                    record_cache_event(endpoint, 'hits')
+                    return response_from_entry(entry, 'HIT', interval)
+                if age <= entry['ttl'] + app.config['RESPONSE_CACHE_MAX_STALENESS']:
+                    record_cache_event(endpoint, 'hits')
+                    schedule_refresh(key, interval, f, request.path, request.query_string.decode())
+                    return response_from_entry(entry, 'STALE', interval)
+            
+            # 같은 키의 동시 요청은 계산 1회를 공유
+            record_cache_event(endpoint, 'misses')
+            entry = single_flight(key, lambda: compute_response(key, interval, f, *args, **kwargs))
+            return response_from_entry(entry, 'MISS', interval)
+        return decorated_function
+    return decorator
+
+def ticker_not_found_response(ticker):
+    """존재하지 않는 종목 응답"""
+    return jsonify({
+        "error": f"'{ticker}' 종목을 찾을 수 없습니다",
+        "details": "종목 심볼을 확인해주세요",
+        "code": "TICKER_NOT_FOUND"
+    }), 404
+
+def is_malformed_symbol(ticker):
+    """
+    업스트림에 물어볼 필요도 없이 존재할 수 없는 심볼인지 확인
+    KRX 심볼은 6자리 코드(숫자, 신규 코드는 영문 포함) + .KS/.KQ 형식이어야 합니다.
+    """
+    import re
+    code, _, suffix = ticker.upper().partition('.')
+    if suffix in ('KS', 'KQ'):
+        return not re.match(r'^[0-9A-Z]{6}$', code)
+    return not code
+
+def is_unknown_ticker(ticker):
+    """
+    업스트림 호출 없이 없는 티커로 판단할 수 있는지 확인
+    형식상 불가능한 심볼은 항상 거절하고, 종목 마스터 대조는 SYMBOL_MASTER_STRICT일 때만 합니다.
+    종목 목록에는 ETF/ETN/신규 상장 종목이 빠져 있으므로 기본값에서는 목록 밖의 티커도
+    업스트림에 요청하고, 없는 종목이면 부정 캐시로 반복 호출을 막습니다.
+    """
+    if is_malformed_symbol(ticker):
+        return True
+    if app.config['SYMBOL_MASTER_STRICT']:
+        return lookup_symbol(ticker) is None
+    return False
+
+def has_no_history(ticker):
+    """
+    전체 기간 일봉이 비어 있는지 확인 (목록 밖 종목의 부정 캐시 판단용)
+    공급자 오류는 종목이 없다는 근거가 아니므로 False를 반환합니다.
+    """
+    try:
+        return fetch_price_history(ticker, 'max', '1d').empty
+    except Exception as e:
+        return is_not_found_error(e)
+
+def reject_unknown_tickers(f):
+    """
+    없는 종목은 업스트림 호출 없이 즉시 거절하는 데코레이터
+    형식/종목 마스터 사전 검사 + 티커 단위 부정 캐시 (다른 기간/엔드포인트에도 적용)
+    yfinance는 없는 종목에 빈 데이터를 돌려주므로, 목록 밖 종목의 NO_DATA는
+    전체 기간 이력도 비어 있을 때 없는 종목으로 기록합니다.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        try:
+            ticker = validate_ticker(request.args.get('ticker'))
+        except ValueError:
+            return f(*args, **kwargs)  # 형식 오류는 뷰에서 처리
+        
+        negative_key = f"negative:{ticker}"
+        if is_unknown_ticker(ticker) or cache.get(negative_key):
+            return ticker_not_found_response(ticker)
+        
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 404:
+            code = (response.get_json(silent=True) or {}).get('code')
+            if code == 'TICKER_NOT_FOUND' or (
+                code == 'NO_DATA' and lookup_symbol(ticker) is None and has_no_history(ticker)
+            ):
+                cache.set(negative_key, True, timeout=app.config['NEGATIVE_CACHE_TTL'])
+                return ticker_not_found_response(ticker)
+        return response
+    return decorated_function
+
+def fast_json_response(payload):
+    """
+    numpy 배열 / pandas Series가 든 응답을 원소별 변환 없이 JSON으로 직렬화
+    NaN/inf는 null, 배열 값은 JSON_SIGNIFICANT_DIGITS 자리로 반올림
+    """
+    body = fast_json.dumps(payload, app.config['JSON_SIGNIFICANT_DIGITS'], default=app.json.default)
+    return app.response_class(body, mimetype='application/json')
+
+def precompressed_response(body, mimetype='application/json', brotli_body=None):
+    """
+    gzip으로 저장된 본문 응답 (gzip을 받지 않는 클라이언트에는 풀어서 전송)
+    brotli_body가 있고 클라이언트가 br을 받으면 그쪽을 보냅니다.
+    """
+    if brotli_body is not None and request.accept_encodings['br']:
+        response = app.response_class(brotli_body, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings['gzip']:
+        response = app.response_class(body, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(gzip.decompress(body), mimetype=mimetype)
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+def precomputed_response(endpoint):
+    """
+    장 마감 후 미리 계산해 둔 응답을 그대로 반환하는 데코레이터
+    유효 구간(마지막 장 마감 ~ 다음 장 시작) 밖이거나 없으면 일반 경로로 처리합니다.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response_format = request.args.get('format', 'json')
+            # 사전 계산 파일은 전체 응답만 보관 (증분/필드 선택 요청은 일반 경로)
+            if (payload_store is None or response_format not in STOCK_RESPONSE_FORMATS
+                    or request.args.get('since') or request.args.get('fields')):
+                return f(*args, **kwargs)
+            try:
+                ticker = validate_ticker(request.args.get('ticker'))
+            except ValueError:
+                return f(*args, **kwargs)
+            
+            entry = payload_store.lookup(
+                ticker, request.args.get('range', '1y'), request.args.get('interval', '1d'), variant=response_format
+            )
+            if entry is None:
+                return f(*args, **kwargs)
+            
+            body = None
+            if 'etag' not in entry or not request.if_none_match.contains_weak(entry['etag']):
+                body = payload_store.read(entry)
+                if body is None:
+                    return f(*args, **kwargs)
+            
+            record_cache_event(endpoint, 'hits')
+            # 다음 장 시작까지 바뀌지 않지만 브라우저 캐시는 일봉 캐시 유지 시간 이내로
+            max_age = min(entry['valid_until'] - time.time(), app.config['RESPONSE_CACHE_TTLS']['daily'])
+            mimetype = BINARY_MIMETYPE if response_format == 'binary' else 'application/json'
+            response = conditional_response(
+                entry.get('etag') or content_etag(body), max(0, int(max_age)),
+                lambda: precompressed_response(body, mimetype)
+            )
+            response.headers['X-Cache'] = 'PRECOMPUTED'
+            return response
+        return decorated_function
+    return decorator
+
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """응답 캐시 적중률 통계"""
+    with _response_cache_stats_lock:
+        stats = {endpoint: dict(counts) for endpoint, counts in _response_cache_stats.items()}
+    for counts in stats.values():
+        total = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / total, 3) if total else None
+    return jsonify(stats)
+
+
 # --- API 1: 차트 데이터 (기술적 분석) ---
+# format=binary: 시계열을 컬럼 버퍼로 보내는 바이너리 형식 (columnar.py 참고)
+STOCK_RESPONSE_FORMATS = ['json', 'binary']
+BINARY_MIMETYPE = 'application/vnd.stock-columns'
+# 가격/거래량/시각은 float64, 파생 지표는 float32 (차트 표시에 충분한 정밀도)
+BINARY_COLUMN_DTYPES = {
+    'bbands.upper': 'float32', 'bbands.middle': 'float32', 'bbands.lower': 'float32',
+    'rsi': 'float32', 'vwap': 'float32',
+    'macd.line': 'float32', 'macd.signal': 'float32', 'macd.histogram': 'float32',
+}
+
+# fields=: 응답에 포함할 섹션 (timestamp/metadata는 항상 포함, 빠진 섹션의 계산/다운로드는 생략)
+STOCK_FIELDS = ['ohlc', 'bbands', 'rsi', 'macd', 'vwap', 'confidence',
+                'dynamic_analysis', 'risk_metrics', 'multi_timeframe', 'backtest']
+INDICATOR_FIELDS = {'bbands', 'rsi', 'macd', 'vwap', 'confidence'}  # 지표 일괄 계산이 필요한 섹션
+THRESHOLD_FIELDS = INDICATOR_FIELDS | {'dynamic_analysis', 'backtest'}  # 동적 임계값이 필요한 섹션
+
+def parse_fields(value):
+    """fields 파라미터 (쉼표 구분) → 섹션 집합 (없으면 전체)"""
+    if not value:
+        return set(STOCK_FIELDS)
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = fields - set(STOCK_FIELDS)
+    if unknown or not fields:
+        raise ValueError(f"지원하지 않는 필드입니다. 허용된 값: {', '.join(STOCK_FIELDS)}")
+    return fields
+
+def parse_since(value):
+    """since 파라미터 (유닉스 시각, 초) 검증 - 없으면 None"""
+    if value is None:
+        return None
+    try:
+        since = int(value)
+    except ValueError:
+        raise ValueError("since는 유닉스 시각(초) 정수여야 합니다")
+    if since < 0:
+        raise ValueError("since는 0 이상이어야 합니다")
+    return since
+
+def slice_since(payload, since, closes):
+    """
+    증분 응답: timestamp가 since 이상인 봉(새 봉 + 갱신됐을 수 있는 마지막 봉)만 남김
+    요약 섹션은 그대로 두고, 클라이언트가 병합 가능 여부를 확인하도록 delta 블록을 붙입니다.
+    (캐시에 first_timestamp 봉이 없거나 지표 파라미터가 바뀌었으면 전체를 다시 요청해야 함)
+    closes: 전체 구간 종가 - since 이전 이력의 기준 종가(첫 봉, since 직전 봉)를 함께 보내
+    분할/배당 수정으로 과거 가격이 바뀐 경우 클라이언트가 알아챌 수 있게 합니다.
+    """
+    timestamps = payload['timestamp']
+    start = int(np.searchsorted(timestamps, since, side='left'))
+    closes = np.asarray(closes, dtype=np.float64)
+    reference_close = lambda i: float(closes[i]) if np.isfinite(closes[i]) else None
+    
+    def cut(section):
+        return {
+            key: cut(value) if isinstance(value, dict)
+            else value.iloc[start:] if isinstance(value, pd.Series)
+            else value[start:] if isinstance(value, np.ndarray)
+            else value
+            for key, value in section.items()
+        }
+    
+    sliced = cut(payload)
+    sliced['delta'] = {
+        'since': since,
+        'rows': len(timestamps) - start,
+        'first_timestamp': int(timestamps[0]),
+        'first_close': reference_close(0),
+        'anchor_timestamp': int(timestamps[start - 1]) if start > 0 else None,
+        'anchor_close': reference_close(start - 1) if start > 0 else None,
+    }
+    return sliced
+
+def epoch_seconds(index):
+    """DatetimeIndex → 유닉스 시각(초) int64 배열"""
+    epoch = pd.Timestamp(0, tz='UTC') if index.tz is not None else pd.Timestamp(0)
+    return np.asarray((index - epoch) // pd.Timedelta(seconds=1), dtype=np.int64)
+
 @app.route('/api/stock')
 @limiter.limit("30 per minute")  # API별 세밀한 제한
-@cache.memoize()
+@reject_unknown_tickers
+@precomputed_response('stock')
+@cached_response('stock')
 @handle_api_errors
 def get_stock_data():
     ticker = request.args.get('ticker')
     data_range = request.args.get('range', '1y')
     interval = request.args.get('interval', '1d')
+    response_format = request.args.get('format', 'json')
 
     # 입력값 검증
     ticker = validate_ticker(ticker)
+    if response_format not in STOCK_RESPONSE_FORMATS:
+        raise ValueError(f"지원하지 않는 응답 형식입니다. 허용된 값: {', '.join(STOCK_RESPONSE_FORMATS)}")
+    since = parse_since(request.args.get('since'))
+    fields = parse_fields(request.args.get('fields'))
     
     # yfinance에서 지원하는 정확한 범위와 간격
     valid_ranges = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
@@ -848,23 +1623,48 @@ def get_stock_data():
         if data_range not in allowed_periods:
             raise ValueError(f"{interval} 간격은 {', '.join(allowed_periods)} 기간에서만 사용 가능합니다.")
 
-    # yfinance 요청 시도 (재시도 로직 포함)
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=data_range, interval=interval, timeout=app.config['API_TIMEOUT'])
-            break
-        except Exception as e:
-            if attempt == max_retries - 1:
-                if "404" in str(e) or "No data found" in str(e):
-                    return jsonify({
-                        "error": f"'{ticker}' 종목을 찾을 수 없습니다",
-                        "details": "종목 심볼을 확인해주세요",
-                        "code": "TICKER_NOT_FOUND"
-                    }), 404
-                raise e
-            time.sleep(1)  # 재시도 전 잠시 대기
+    # 업스트림 요청을 한 번에 동시 발행하고 전체 마감 시간 안에서 결과를 모읍니다.
+    deadline = time.monotonic() + app.config['REQUEST_DEADLINE']
+    benchmark = select_benchmark(ticker)
+    # 종목군 행렬에 베타가 있으면 벤치마크 지수를 받지 않음
+    matrix_beta = lookup_matrix_beta(ticker, benchmark, data_range, interval) if 'risk_metrics' in fields else None
+    price_future = upstream_executor.submit(fetch_price_history, ticker, data_range, interval)
+    run_multi_timeframe = (
+        'multi_timeframe' in fields
+        and data_range in ['3mo', '6mo', '1y', '2y', '5y', 'max'] and interval in ['1d', '1wk']
+    )
+
+    def submit_optional_fetches():
+        market = None
+        if 'risk_metrics' in fields and matrix_beta is None:
+            market = upstream_executor.submit(fetch_market_history, ticker, data_range, interval)
+        timeframes = {}
+        if run_multi_timeframe:
+            # 차트 데이터로 파생할 수 없는 시간대만 따로 요청
+            timeframes = {
+                key: upstream_executor.submit(fetch_timeframe_history, ticker, key)
+                for key in timeframes_to_fetch(data_range, interval)
+            }
+        return market, timeframes
+
+    # 종목 목록에 있는 종목은 벤치마크/다중 시간대를 시세와 동시에 받고,
+    # 목록 밖의 종목은 시세가 있는 것을 확인한 뒤에 받습니다 (없는 종목이 추가 호출을 만들지 않도록).
+    listed_symbol = lookup_symbol(ticker) is not None
+    market_future, timeframe_futures = submit_optional_fetches() if listed_symbol else (None, {})
+    optional_futures = [future for future in (market_future, *timeframe_futures.values()) if future is not None]
+
+    try:
+        data = price_future.result(timeout=max(0, deadline - time.monotonic()))
+    except TimeoutError:
+        for future in optional_futures:
+            future.cancel()
+        raise TimeoutError(f"Price history for {ticker} missed the request deadline")
+    except Exception as e:
+        for future in optional_futures:
+            future.cancel()
+        if is_not_found_error(e):
+            return ticker_not_found_response(ticker)
+        raise e
 
     if data.empty:
         return jsonify({
@@ -881,94 +1681,101 @@ def get_stock_data():
             "code": "INSUFFICIENT_DATA"
         }), 400
 
-    # 동적 임계값 계산
-    dynamic_thresholds = calculate_dynamic_thresholds(data)
-    
-    # 동적 파라미터를 적용한 기술적 지표 계산
-    bbu, bbm, bbl = calculate_bbands(
-        data['Close'], 
-        length=dynamic_thresholds['bollinger']['period'],
-        std=dynamic_thresholds['bollinger']['std_dev']
-    )
-    rsi = calculate_rsi(data['Close'])  # RSI는 계산 자체는 동일, 임계값만 동적 적용
-    macd_line, macd_signal, macd_hist = calculate_macd(
-        data['Close'],
-        fast=dynamic_thresholds['macd']['fast'],
-        slow=dynamic_thresholds['macd']['slow'],
-        signal=dynamic_thresholds['macd']['signal']
-    )
-    vwap = calculate_vwap(
-        data['High'], data['Low'], data['Close'], data['Volume'],
-        period=dynamic_thresholds['vwap']['period']
-    )
+    if not listed_symbol:
+        market_future, timeframe_futures = submit_optional_fetches()
 
-    # 신뢰도 메트릭스 계산
-    confidence_metrics = calculate_confidence_metrics(data)
-    
-    # 각 지표별 신뢰도 계산
-    confidences = {
-        'vwap': calculate_indicator_confidence('VWAP', vwap.iloc[-1] if len(vwap) > 0 else None, confidence_metrics),
-        'rsi': calculate_indicator_confidence('RSI', rsi.iloc[-1] if len(rsi) > 0 else None, confidence_metrics),
-        'macd': calculate_indicator_confidence('MACD', macd_line.iloc[-1] if len(macd_line) > 0 else None, confidence_metrics),
-        'bollinger': calculate_indicator_confidence('Bollinger', bbu.iloc[-1] if len(bbu) > 0 else None, confidence_metrics)
-    }
-    
-    # 백테스팅 결과 계산
-    backtest_results = backtest_signals(data, dynamic_thresholds)
+    # 요청 단위 분석 컨텍스트 (수익률, RSI 등 파생 시계열을 한 번만 계산해 공유)
+    context = AnalysisContext(data)
     
-    # KOSPI 데이터 가져오기 (베타 계산용)
-    market_data = None
-    try:
-        kospi_ticker = yf.Ticker("^KS11")  # KOSPI 지수
-        market_data = kospi_ticker.history(period=data_range, interval=interval, timeout=5)
-        if market_data.empty:
-            market_data = None
-    except Exception as e:
-        logging.warning(f"Market data fetch failed: {e}")
-        market_data = None
+    # 동적 임계값 계산 (지표/백테스트/동적 분석 섹션에서만 필요)
+    dynamic_thresholds = None
+    if fields & THRESHOLD_FIELDS:
+        dynamic_thresholds = calculate_dynamic_thresholds(data, context)
     
-    # 리스크 지표 계산
-    risk_metrics = calculate_risk_metrics(data, market_data)
-    
-    # 다중 시간대 분석 (장기 분석에서만 실행)
-    multi_timeframe = None
-    if data_range in ['3mo', '6mo', '1y', '2y', '5y', 'max'] and interval in ['1d', '1wk']:
-        multi_timeframe = analyze_multiple_timeframes(ticker, data_range)
+    # 동적 파라미터를 적용한 기술적 지표 계산 (한 번의 일괄 계산)
+    # RSI는 계산 자체는 동일, 임계값만 동적 적용
+    if fields & INDICATOR_FIELDS:
+        indicator_params = {
+            'bb_length': dynamic_thresholds['bollinger']['period'],
+            'bb_std': dynamic_thresholds['bollinger']['std_dev'],
+            'rsi_length': 14,
+            'macd_fast': dynamic_thresholds['macd']['fast'],
+            'macd_slow': dynamic_thresholds['macd']['slow'],
+            'macd_signal': dynamic_thresholds['macd']['signal'],
+            'vwap_period': dynamic_thresholds['vwap']['period']
+        }
+        indicators = None
+        if indicator_states is not None:
+            # 바 저장소 전체 시계열 기준 상태에서 새 봉만 이어서 계산하고 요청 기간만 잘라 씀
+            indicators = compute_stored_indicators(ticker, interval, data, indicator_params)
+        if indicators is None:
+            indicators = indicator_engine.compute_indicators(
+                context.get('array', 'Close'), context.get('array', 'High'),
+                context.get('array', 'Low'), context.get('array', 'Volume'),
+                rsi_values=context.get('rsi', 14).to_numpy(),  # 임계값 계산에서 이미 구한 RSI
+                **indicator_params
+            )
+        bbu, bbm, bbl, rsi, macd_line, macd_signal, macd_hist, vwap = (
+            pd.Series(indicators[name], index=data.index)
+            for name in ('bb_upper', 'bb_middle', 'bb_lower', 'rsi', 'macd_line', 'macd_signal', 'macd_hist', 'vwap')
+        )
+        # 일괄 계산 결과를 컨텍스트에 등록해 이후 단계에서 재사용
+        context.put('bbands', indicator_params['bb_length'], indicator_params['bb_std'], value=(bbu, bbm, bbl))
+        context.put('macd', indicator_params['macd_fast'], indicator_params['macd_slow'], indicator_params['macd_signal'],
+                    value=(macd_line, macd_signal, macd_hist))
+        context.put('vwap', indicator_params['vwap_period'], value=vwap)
+        
+        # 섹터 집계 갱신 (S&P 500 구성 종목의 일봉만)
+        if interval == '1d':
+            update_sector_member(ticker, context.returns, data['Close'], vwap, macd_line, macd_signal)
 
-    # 안전한 데이터 변환
-    def safe_convert(series):
-        return series.replace([np.inf, -np.inf], np.nan).replace({np.nan: None}).tolist()
+    # 시계열은 응답 형식에 맞게 마지막에 변환 (JSON 목록 / 바이너리 컬럼)
+    response_data = {"timestamp": epoch_seconds(data.index)}
+    if 'ohlc' in fields:
+        response_data["ohlc"] = {
+            "open": data['Open'],
+            "high": data['High'],
+            "low": data['Low'],
+            "close": data['Close'],
+            "volume": data['Volume']
+        }
+    if 'bbands' in fields:
+        response_data["bbands"] = {
+            "upper": bbu,
+            "middle": bbm,
+            "lower": bbl
+        }
+    if 'rsi' in fields:
+        response_data["rsi"] = rsi
+    if 'macd' in fields:
+        response_data["macd"] = {
+            "line": macd_line,
+            "signal": macd_signal,
+            "histogram": macd_hist
+        }
+    if 'vwap' in fields:
+        response_data["vwap"] = vwap
+    response_data["metadata"] = {
+        "ticker": ticker,
+        "period": data_range,
+        "interval": interval,
+        "data_points": len(data),
+        "start_date": data.index[0].isoformat(),
+        "end_date": data.index[-1].isoformat()
+    }
 
-    response_data = {
-        "timestamp": [int(t.timestamp()) for t in data.index],
-        "ohlc": {
-            "open": safe_convert(data['Open']),
-            "high": safe_convert(data['High']),
-            "low": safe_convert(data['Low']),
-            "close": safe_convert(data['Close']),
-            "volume": safe_convert(data['Volume'])
-        },
-        "bbands": {
-            "upper": safe_convert(bbu),
-            "middle": safe_convert(bbm),
-            "lower": safe_convert(bbl)
-        },
-        "rsi": safe_convert(rsi),
-        "macd": {
-            "line": safe_convert(macd_line),
-            "signal": safe_convert(macd_signal),
-            "histogram": safe_convert(macd_hist)
-        },
-        "vwap": safe_convert(vwap),
-        "metadata": {
-            "ticker": ticker,
-            "period": data_range,
-            "interval": interval,
-            "data_points": len(data),
-            "start_date": data.index[0].isoformat(),
-            "end_date": data.index[-1].isoformat()
-        },
-        "confidence": {
+    if 'confidence' in fields:
+        # 신뢰도 메트릭스 계산
+        confidence_metrics = calculate_confidence_metrics(data, context)
+        
+        # 각 지표별 신뢰도 계산
+        confidences = {
+            'vwap': calculate_indicator_confidence('VWAP', vwap.iloc[-1] if len(vwap) > 0 else None, confidence_metrics),
+            'rsi': calculate_indicator_confidence('RSI', rsi.iloc[-1] if len(rsi) > 0 else None, confidence_metrics),
+            'macd': calculate_indicator_confidence('MACD', macd_line.iloc[-1] if len(macd_line) > 0 else None, confidence_metrics),
+            'bollinger': calculate_indicator_confidence('Bollinger', bbu.iloc[-1] if len(bbu) > 0 else None, confidence_metrics)
+        }
+        response_data["confidence"] = {
             "indicators": confidences,
             "metrics": {
                 "volume_ratio": round(confidence_metrics['volume_ratio'], 2),
@@ -977,70 +1784,702 @@ def get_stock_data():
                 "data_quality_score": int(confidence_metrics['data_completeness'] * 100)
             },
             "warnings": generate_warnings(confidence_metrics, data)
-        },
-        "dynamic_analysis": {
+        }
+    
+    if 'dynamic_analysis' in fields:
+        response_data["dynamic_analysis"] = {
             "thresholds": dynamic_thresholds,
             "is_optimized": True,
             "explanation": "이 종목의 특성에 맞게 최적화된 분석 파라미터가 적용되었습니다."
-        },
-        "risk_metrics": risk_metrics,
-        "multi_timeframe": multi_timeframe,
-        "backtest": {
+        }
+    
+    # 백테스팅 결과 계산 (벤치마크/시간대 다운로드를 기다리기 전에)
+    if 'backtest' in fields:
+        backtest_results = backtest_signals(data, dynamic_thresholds, context=context)
+    
+    if 'risk_metrics' in fields:
+        # 벤치마크 지수 데이터 (베타 계산용, 마감 시간 초과 시 베타 생략)
+        market_data = collect_optional(market_future, deadline, "Market data") if market_future is not None else None
+        
+        # 리스크 지표 계산
+        risk_metrics = calculate_risk_metrics(data, market_data, context, beta=matrix_beta)
+        risk_metrics['benchmark'] = {'symbol': benchmark, 'name': BENCHMARK_NAMES[benchmark]}
+        response_data["risk_metrics"] = risk_metrics
+    
+    if 'multi_timeframe' in fields:
+        # 다중 시간대 분석 (장기 분석에서만 실행, 마감 시간을 넘긴 시간대는 제외)
+        multi_timeframe = None
+        if run_multi_timeframe:
+            timeframe_data = {
+                key: collect_optional(future, deadline, f"Timeframe {key}")
+                for key, future in timeframe_futures.items()
+            }
+            multi_timeframe = analyze_multiple_timeframes(
+                ticker, data_range,
+                timeframe_data=timeframe_data,
+                base_data=data,
+                base_interval=interval
+            )
+        response_data["multi_timeframe"] = multi_timeframe
+    
+    if 'backtest' in fields:
+        response_data["backtest"] = {
             "results": backtest_results,
             "explanation": "최근 30일간 각 지표의 실제 성과를 기반으로 한 신호 검증 결과입니다.",
             "disclaimer": "과거 성과가 미래 수익을 보장하지 않습니다."
         }
+
+    logging.debug(f"Analysis timings for {ticker}: {context.format_timings()}")
+    
+    if since is not None:
+        response_data = slice_since(response_data, since, data['Close'])
+    
+    if response_format == 'binary':
+        return app.response_class(
+            encode_columnar(response_data, BINARY_COLUMN_DTYPES, default=app.json.default),
+            mimetype=BINARY_MIMETYPE
+        )
+    
+    return fast_json_response(response_data)
+
+
+# --- API 1-2: 백테스트 파라미터 스윕 ---
+SWEEP_RANGES = ['3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+SWEEP_INTERVALS = ['1d', '1wk']
+
+def int_arg(name, default, minimum=1):
+    """정수 쿼리 파라미터 (없으면 기본값)"""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} 값은 정수여야 합니다")
+    if value < minimum:
+        raise ValueError(f"{name} 값은 {minimum} 이상이어야 합니다")
+    return value
+
+def current_sweep_params(indicator, thresholds):
+    """동적 임계값이 고른 파라미터를 스윕 그리드 형식으로 변환"""
+    if indicator == 'rsi':
+        return {
+            'length': 14,
+            'upper': thresholds['rsi']['upper_threshold'],
+            'lower': thresholds['rsi']['lower_threshold']
+        }
+    if indicator == 'bollinger':
+        return {'period': thresholds['bollinger']['period'], 'std_dev': thresholds['bollinger']['std_dev']}
+    if indicator == 'macd':
+        return {key: thresholds['macd'][key] for key in ('fast', 'slow', 'signal')}
+    return {'period': thresholds['vwap']['period']}
+
+@app.route('/api/backtest/sweep')
+@limiter.limit("10 per minute")  # 계산량이 많으므로 더 제한적
+@reject_unknown_tickers
+@cached_response('sweep')
+@handle_api_errors
+def get_backtest_sweep():
+    """
+    지표 파라미터 그리드 백테스트 - 성과 곡면, 최적 조합, 현재 동적 임계값의 성과
+    예: /api/backtest/sweep?ticker=AAPL&indicator=rsi&upper=65,70,75&lower=25,30&holding=5
+    """
+    ticker = validate_ticker(request.args.get('ticker'))
+    data_range = request.args.get('range', '1y')
+    interval = request.args.get('interval', '1d')
+    indicator = request.args.get('indicator', 'rsi')
+    metric = request.args.get('metric', 'avg_return')
+
+    if data_range not in SWEEP_RANGES:
+        raise ValueError(f"지원하지 않는 기간입니다. 허용된 값: {', '.join(SWEEP_RANGES)}")
+    if interval not in SWEEP_INTERVALS:
+        raise ValueError(f"지원하지 않는 간격입니다. 허용된 값: {', '.join(SWEEP_INTERVALS)}")
+
+    grid = parse_grid(indicator, request.args)
+    holding_period = int_arg('holding', BACKTEST_HOLDING_PERIODS[indicator])
+    lookback_days = int_arg('lookback', None)  # 없으면 전체 기간
+    min_signals = int_arg('min_signals', 5, minimum=0)
+    combinations = len(grid_combinations(indicator, grid))
+    if combinations == 0:
+        raise ValueError("유효한 파라미터 조합이 없습니다 (RSI는 lower < upper, MACD는 fast < slow)")
+    if combinations > app.config['SWEEP_MAX_COMBINATIONS']:
+        raise ValueError(f"조합 수({combinations})가 최대 {app.config['SWEEP_MAX_COMBINATIONS']}개를 넘습니다")
+
+    try:
+        data = fetch_price_history(ticker, data_range, interval)
+    except Exception as e:
+        if is_not_found_error(e):
+            return ticker_not_found_response(ticker)
+        raise e
+
+    required = (lookback_days or 0) + BACKTEST_WARMUP
+    if data.empty or len(data) < max(required, BACKTEST_START_OFFSETS[indicator] + holding_period + 1):
+        return jsonify({
+            "error": "충분한 데이터가 없습니다",
+            "details": "더 긴 기간을 선택하거나 lookback을 줄여보세요",
+            "code": "INSUFFICIENT_DATA"
+        }), 400
+
+    # 현재 동적 임계값은 차트 분석과 같이 전체 기간 데이터로 계산
+    thresholds = calculate_dynamic_thresholds(data)
+    test_data = data.tail(required) if lookback_days else data
+    arrays = {
+        'close': as_float_array(test_data['Close']),
+        'high': as_float_array(test_data['High']),
+        'low': as_float_array(test_data['Low']),
+        'volume': as_float_array(test_data['Volume'])
     }
+    start = BACKTEST_START_OFFSETS[indicator]
+
+    result = run_sweep(
+        arrays, indicator, grid, holding_period, start,
+        metric=metric, min_signals=min_signals, workers=app.config['SWEEP_MAX_WORKERS']
+    )
+    current_params = current_sweep_params(indicator, thresholds)
+    current = run_sweep(
+        arrays, indicator, {name: [value] for name, value in current_params.items()},
+        holding_period, start, metric=metric, min_signals=0
+    )['surface']
+
+    result.update({
+        'ticker': ticker,
+        'range': data_range,
+        'interval': interval,
+        'lookback_days': lookback_days,
+        'bars': len(test_data),
+        'current': current[0] if current else {'params': current_params, **EMPTY_BACKTEST_RESULT}
+    })
+    return jsonify(result)
+
+
+# --- API 1-3: 종목 스크리너 (스냅샷 조회) ---
+def screen_symbol(symbol, data):
+    """
+    스크리너 스냅샷 1행 - 차트 분석과 같은 동적 임계값/지표로 마지막 봉 상태를 요약
+    데이터가 부족하면 None
+    """
+    data = data.dropna(subset=['Close'])
+    if len(data) < 30:
+        return None
+    
+    context = AnalysisContext(data)
+    thresholds = calculate_dynamic_thresholds(data, context)
+    metrics = calculate_confidence_metrics(data, context)
+    rsi = context.get('rsi', 14)
+    macd_line, macd_signal, macd_hist = context.get(
+        'macd', thresholds['macd']['fast'], thresholds['macd']['slow'], thresholds['macd']['signal']
+    )
+    bbu, bbm, bbl = context.get('bbands', thresholds['bollinger']['period'], thresholds['bollinger']['std_dev'])
+    vwap = context.get('vwap', thresholds['vwap']['period'])
+    
+    close = float(data['Close'].iloc[-1])
+    band_width = bbu.iloc[-1] - bbl.iloc[-1]
+    # 마지막 봉의 MACD 교차 (백테스트와 같은 규칙)
+    golden_cross = macd_line.iloc[-2] <= macd_signal.iloc[-2] and macd_line.iloc[-1] > macd_signal.iloc[-1]
+    dead_cross = macd_line.iloc[-2] >= macd_signal.iloc[-2] and macd_line.iloc[-1] < macd_signal.iloc[-1]
+    
+    row = {
+        'symbol': symbol,
+        'as_of': data.index[-1].isoformat(),
+        'close': close,
+        'change_pct': context.returns.iloc[-1] * 100,
+        'volume': data['Volume'].iloc[-1],
+        'volume_ratio': metrics['volume_ratio'],
+        'volatility': context.returns.tail(30).std() * np.sqrt(252) * 100,
+        'rsi': rsi.iloc[-1],
+        'rsi_upper': thresholds['rsi']['upper_threshold'],
+        'rsi_lower': thresholds['rsi']['lower_threshold'],
+        'macd': macd_line.iloc[-1],
+        'macd_signal': macd_signal.iloc[-1],
+        'macd_hist': macd_hist.iloc[-1],
+        'golden_cross': int(golden_cross),
+        'dead_cross': int(dead_cross),
+        'bb_upper': bbu.iloc[-1],
+        'bb_lower': bbl.iloc[-1],
+        'bb_position': (close - bbl.iloc[-1]) / band_width if band_width > 0 else None,
+        'vwap': vwap.iloc[-1],
+    }
+    # SQLite 저장용: numpy 값은 파이썬 숫자로, NaN/inf는 NULL로
+    return {
+        key: (None if isinstance(value, float) and not np.isfinite(value) else value)
+        for key, value in ((key, value.item() if isinstance(value, np.generic) else value) for key, value in row.items())
+    }
+
+def screen_batch(frames):
+    """스크리너 배치 작업 (프로세스 풀에서 실행) - {심볼: OHLCV} → 스냅샷 행 목록"""
+    rows = []
+    for symbol, data in frames.items():
+        try:
+            row = screen_symbol(symbol, data)
+        except Exception as e:
+            logging.warning(f"Screener analysis failed for {symbol}: {e}")
+            continue
+        if row is not None:
+            rows.append(row)
+    return rows
+
+def provider_download_batch(symbols, **kwargs):
+    """공급자 래퍼를 거친 다중 종목 다운로드 (CLI 배치 전용이라 재시도 예산을 길게)"""
+    return provider.call(download_batch, symbols, retry_budget=app.config['PROVIDER_BATCH_RETRY_BUDGET'], **kwargs)
+
+@app.cli.command('build-screener')
+@click.option('--universe', 'universes', multiple=True, type=click.Choice(UNIVERSES),
+              help='대상 종목군 (여러 번 지정 가능, 기본: 전체)')
+@click.option('--workers', type=int, default=None, help='분석 프로세스 수')
+def build_screener_command(universes, workers):
+    """종목 스크리너 스냅샷 생성 (예: flask --app server build-screener --universe sp500)"""
+    universe = load_universe(BASE_DIR, list(universes) or UNIVERSES)
+    count = build_snapshot(
+        screen_batch, universe, app.config['SCREENER_DB_PATH'],
+        download=provider_download_batch,
+        period=app.config['SCREENER_PERIOD'],
+        batch_size=app.config['SCREENER_BATCH_SIZE'],
+        workers=workers or app.config['SCREENER_WORKERS']
+    )
+    click.echo(f"Screener snapshot: {count}/{len(universe)} symbols -> {app.config['SCREENER_DB_PATH']}")
+
+@app.route('/api/screener')
+@limiter.limit("60 per minute")
+@handle_api_errors
+def get_screener():
+    """
+    스냅샷 기반 종목 필터 조회
+    예: /api/screener?universe=sp500&rsi_oversold=1&golden_cross=1&sort=rsi&limit=50
+    """
+    if not screener_snapshot.exists():
+        return jsonify({
+            "error": "스크리너 스냅샷이 아직 없습니다",
+            "details": "flask --app server build-screener 로 스냅샷을 먼저 생성해주세요",
+            "code": "SCREENER_NOT_READY"
+        }), 503
+    
+    total, results = screener_snapshot.query(request.args)
+    meta = screener_snapshot.meta()
+    return jsonify({
+        "built_at": meta.get('built_at'),
+        "universe_size": int(meta.get('symbols', 0)),
+        "total": total,
+        "count": len(results),
+        "results": results
+    })
+
+
+# --- API 1-4: 종목군 상관/베타 행렬 ---
+CORRELATION_MAX_SYMBOLS = 50
+
+def finite_or_none(value, digits=4):
+    """NaN/inf는 None, 나머지는 반올림한 float"""
+    return round(float(value), digits) if np.isfinite(value) else None
+
+@app.cli.command('build-risk-matrix')
+@click.option('--universe', 'universes', multiple=True, type=click.Choice(UNIVERSES),
+              help='대상 종목군 (여러 번 지정 가능, 기본: 전체)')
+def build_risk_matrix_command(universes):
+    """종목군 상관/공분산 행렬과 벤치마크 베타 생성 (예: flask --app server build-risk-matrix --universe sp500)"""
+    period = app.config['RISK_MATRIX_PERIOD']
+    batch_size = app.config['SCREENER_BATCH_SIZE']
+    benchmarks = list(BENCHMARK_NAMES)
+    benchmark_frames = provider_download_batch(benchmarks, period=period, interval='1d')
+    benchmark_closes = {symbol: benchmark_frames[symbol]['Close'] for symbol in benchmarks if symbol in benchmark_frames}
+    
+    for universe in universes or UNIVERSES:
+        symbols = [row['symbol'] for row in load_universe(BASE_DIR, [universe])]
+        closes = {}
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            try:
+                frames = provider_download_batch(batch, period=period, interval='1d')
+            except Exception as e:
+                logging.warning(f"Risk matrix download failed for {universe} batch {start // batch_size + 1}: {e}")
+                continue
+            closes.update({symbol: frame['Close'] for symbol, frame in frames.items()})
+        try:
+            count = build_matrix(closes, benchmark_closes, risk_matrices[universe].path, period=period)
+        except ValueError as e:
+            click.echo(f"Risk matrix {universe}: {e}")
+            continue
+        click.echo(f"Risk matrix {universe}: {count}/{len(symbols)} symbols -> {risk_matrices[universe].path}")
+
+@app.route('/api/correlation')
+@limiter.limit("60 per minute")
+@handle_api_errors
+def get_correlation():
+    """
+    종목군 행렬 조회
+    - symbols=AAPL,MSFT,NVDA: 요청 종목끼리의 상관계수/공분산 행렬과 베타
+    - ticker=AAPL&limit=10: 상관이 가장 높은/낮은 종목
+    """
+    universe = request.args.get('universe', 'sp500')
+    if universe not in UNIVERSES:
+        raise ValueError(f"지원하지 않는 종목군입니다. 허용된 값: {', '.join(UNIVERSES)}")
+    matrix = risk_matrices[universe]
+    meta = matrix.meta() if matrix.exists() else None
+    if meta is None:
+        return jsonify({
+            "error": "상관 행렬이 아직 없습니다",
+            "details": "flask --app server build-risk-matrix 로 행렬을 먼저 생성해주세요",
+            "code": "RISK_MATRIX_NOT_READY"
+        }), 503
+    
+    if request.args.get('ticker'):
+        ticker = validate_ticker(request.args.get('ticker'))
+        neighbors = matrix.neighbors(ticker, limit=min(int_arg('limit', 10), CORRELATION_MAX_SYMBOLS))
+        if neighbors is None:
+            raise ValueError(f"'{ticker}' 종목이 {universe} 행렬에 없습니다")
+        most, least = neighbors
+        _, _, _, betas = matrix.correlation([ticker])
+        return jsonify({
+            "universe": universe,
+            "matrix": meta,
+            "ticker": ticker,
+            "betas": {name: finite_or_none(value, 3) for name, value in betas[ticker].items()},
+            "most_correlated": [{"symbol": s, "correlation": finite_or_none(c)} for s, c in most],
+            "least_correlated": [{"symbol": s, "correlation": finite_or_none(c)} for s, c in least]
+        })
     
-    return jsonify(response_data)
+    symbols = list(dict.fromkeys(
+        validate_ticker(s.strip()) for s in request.args.get('symbols', '').split(',') if s.strip()
+    ))
+    if not symbols:
+        raise ValueError("symbols 또는 ticker 파라미터가 필요합니다")
+    if len(symbols) > CORRELATION_MAX_SYMBOLS:
+        raise ValueError(f"한 번에 최대 {CORRELATION_MAX_SYMBOLS}개 종목까지 조회할 수 있습니다")
+    found, correlation, covariance, betas = matrix.correlation(symbols)
+    return jsonify({
+        "universe": universe,
+        "matrix": meta,
+        "symbols": found,
+        "missing": [s for s in symbols if s not in found],
+        "correlation": [[finite_or_none(v) for v in row] for row in correlation],
+        "covariance": [[finite_or_none(v, 8) for v in row] for row in covariance],
+        "betas": {
+            symbol: {name: finite_or_none(value, 3) for name, value in values.items()}
+            for symbol, values in betas.items()
+        }
+    })
+
+
+# --- API 1-5: 섹터 집계 (S&P 500 Sector 열 기준, 메모리 유지) ---
+_sector_aggregates = None
+_sector_seed_thread = None
+_sector_aggregates_lock = threading.Lock()
+
+def last_greater(left, right):
+    """마지막 봉에서 left > right 여부 (값이 없으면 None)"""
+    a, b = left.iloc[-1], right.iloc[-1]
+    if not (np.isfinite(a) and np.isfinite(b)):
+        return None
+    return bool(a > b)
+
+def update_sector_member(ticker, returns, close, vwap, macd_line, macd_signal):
+    """분석한 종목이 섹터 구성 종목이면 수익률/시장 폭 신호를 반영 (집계를 처음 만들기 전에는 생략)"""
+    aggregates = _sector_aggregates
+    if aggregates is None or not aggregates.is_member(ticker):
+        return
+    aggregates.update_series(ticker, returns, last_greater(close, vwap), last_greater(macd_line, macd_signal))
+
+def sector_members():
+    """S&P 500 구성 종목 → 섹터"""
+    return {row['symbol']: row['sector'] for row in load_universe(BASE_DIR, ['sp500'])}
+
+def seed_sector_aggregates():
+    """
+    디스크에 저장된 일봉(바 저장소)과 펀더멘털(펀더멘털 저장소)로 섹터 집계 생성
+    공급자는 호출하지 않지만 전체 구성 종목을 분석하므로 수 분이 걸릴 수 있습니다 (요청 경로에서 호출하지 않음).
+    """
+    started = time.time()
+    aggregates = SectorAggregates(sector_members())
+    for symbol in aggregates.members:
+        try:
+            data = bar_store.stored(symbol, '1d')
+            if data is not None:
+                data = slice_period(data, app.config['SCREENER_PERIOD'])
+                row = screen_symbol(symbol, data)
+                if row is not None:
+                    aggregates.update_series(
+                        symbol, data['Close'].dropna().pct_change(),
+                        bool(row['close'] > row['vwap']) if row['vwap'] is not None else None,
+                        bool(row['macd'] > row['macd_signal']) if None not in (row['macd'], row['macd_signal']) else None
+                    )
+            info, stats = fundamentals_store.peek(symbol)
+            if info is not None:
+                aggregates.update_fundamentals(symbol, info.get('marketCap'), stats)
+        except Exception as e:
+            logging.warning(f"Sector seed failed for {symbol}: {e}")
+    logging.info(f"Sector aggregates seeded for {len(aggregates.members)} members in {time.time() - started:.1f}s")
+    return aggregates
+
+def seed_sector_aggregates_in_background():
+    """스냅샷이 없을 때 요청과 별도로 집계 생성 (실패하면 다음 요청에서 다시 시작)"""
+    global _sector_aggregates, _sector_seed_thread
+    try:
+        _sector_aggregates = seed_sector_aggregates()
+    except Exception as e:
+        logging.error(f"Sector aggregates seed failed: {e}")
+    finally:
+        with _sector_aggregates_lock:
+            _sector_seed_thread = None
+
+def get_sector_aggregates():
+    """
+    섹터 집계 (준비되지 않았으면 None)
+    flask build-sector-aggregates / precompute-payloads가 저장한 스냅샷을 읽고,
+    스냅샷이 없으면 백그라운드에서 생성을 시작합니다 (요청은 기다리지 않음).
+    이후에는 /api/stock, /api/stock/info 분석 결과로 종목별로 갱신됩니다.
+    """
+    global _sector_aggregates, _sector_seed_thread
+    if _sector_aggregates is not None:
+        return _sector_aggregates
+    with _sector_aggregates_lock:
+        if _sector_aggregates is None and _sector_seed_thread is None:
+            _sector_aggregates = SectorAggregates.load(app.config['SECTOR_AGGREGATES_PATH'], sector_members())
+            if _sector_aggregates is None:
+                _sector_seed_thread = threading.Thread(
+                    target=seed_sector_aggregates_in_background, name='sector-seed', daemon=True
+                )
+                _sector_seed_thread.start()
+    return _sector_aggregates
+
+def save_sector_snapshot():
+    """섹터 집계를 생성해 스냅샷 파일로 저장"""
+    aggregates = seed_sector_aggregates()
+    aggregates.save(app.config['SECTOR_AGGREGATES_PATH'])
+    click.echo(f"Saved sector aggregates for {len(aggregates.members)} members to {app.config['SECTOR_AGGREGATES_PATH']}")
+
+@app.cli.command('build-sector-aggregates')
+def build_sector_aggregates_command():
+    """섹터 집계 스냅샷 생성 (디스크 저장본 기준, 예: flask --app server build-sector-aggregates)"""
+    save_sector_snapshot()
+
+@app.route('/api/sectors')
+@limiter.limit("60 per minute")
+@handle_api_errors
+def get_sectors():
+    """
+    섹터별 수익률/변동성/시장 폭/펀더멘털 중앙값
+    예: /api/sectors, /api/sectors?sector=Information Technology
+    """
+    aggregates = get_sector_aggregates()
+    if aggregates is None:
+        return jsonify({
+            "error": "섹터 집계를 준비하고 있습니다",
+            "details": "잠시 후 다시 시도해주세요 (flask --app server build-sector-aggregates 로 미리 생성할 수 있습니다)",
+            "code": "SECTOR_AGGREGATES_NOT_READY"
+        }), 503, {'Retry-After': str(app.config['SECTOR_SEED_RETRY_AFTER'])}
+    sector = request.args.get('sector')
+    if sector:
+        result = aggregates.get(sector)
+        if result is None:
+            raise ValueError(f"알 수 없는 섹터입니다. 허용된 값: {', '.join(aggregates.sectors())}")
+        return jsonify(result)
+    return jsonify({"sectors": aggregates.get()})
+
+
+# --- API 1-6: 포트폴리오 리스크 ---
+PORTFOLIO_RANGES = ['3mo', '6mo', '1y', '2y', '5y', 'max']
+PORTFOLIO_MAX_POSITIONS = 20
+
+def parse_portfolio_args():
+    """tickers / weights 쿼리 파라미터 → (티커 목록, 합이 1인 비중 배열) - 비중이 없으면 동일 비중"""
+    tickers = [validate_ticker(t.strip()) for t in request.args.get('tickers', '').split(',') if t.strip()]
+    if not tickers:
+        raise ValueError("tickers 파라미터가 필요합니다 (예: tickers=AAPL,005930.KS)")
+    if len(tickers) > PORTFOLIO_MAX_POSITIONS:
+        raise ValueError(f"한 번에 최대 {PORTFOLIO_MAX_POSITIONS}개 종목까지 분석할 수 있습니다")
+    if len(set(tickers)) != len(tickers):
+        raise ValueError("중복된 티커가 있습니다")
+    
+    raw = request.args.get('weights')
+    if not raw:
+        return tickers, np.full(len(tickers), 1 / len(tickers))
+    try:
+        weights = np.array([float(w) for w in raw.split(',')], dtype=np.float64)
+    except ValueError:
+        raise ValueError("weights 값은 쉼표로 구분된 숫자여야 합니다")
+    if len(weights) != len(tickers):
+        raise ValueError("weights 개수가 tickers 개수와 같아야 합니다")
+    if not np.all(np.isfinite(weights)) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("weights 값은 0 이상이고 합이 0보다 커야 합니다")
+    return tickers, weights / weights.sum()
+
+@app.route('/api/portfolio')
+@limiter.limit("20 per minute")
+@handle_api_errors
+def get_portfolio():
+    """
+    여러 종목(한국/미국 혼합 가능)의 포트폴리오 리스크
+    예: /api/portfolio?tickers=AAPL,MSFT,005930.KS&weights=0.5,0.3,0.2&range=1y
+    수익률은 각 종목의 현지 통화 기준이며, 합친 거래일 달력에서 거래가 없던 날은 수익률 0으로 봅니다.
+    """
+    tickers, weights = parse_portfolio_args()
+    data_range = request.args.get('range', '1y')
+    if data_range not in PORTFOLIO_RANGES:
+        raise ValueError(f"지원하지 않는 기간입니다. 허용된 값: {', '.join(PORTFOLIO_RANGES)}")
+    
+    # 종목 시세를 동시에 요청 (바 저장소에 있으면 증분만)
+    deadline = time.monotonic() + app.config['REQUEST_DEADLINE']
+    futures = {ticker: upstream_executor.submit(fetch_price_history, ticker, data_range, '1d') for ticker in tickers}
+    closes, missing = {}, []
+    for ticker, future in futures.items():
+        try:
+            data = future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            for pending in futures.values():
+                pending.cancel()
+            raise TimeoutError(f"Price history for {ticker} missed the request deadline")
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise e
+            data = pd.DataFrame()
+        if data.empty:
+            missing.append(ticker)
+        else:
+            closes[ticker] = data['Close']
+    
+    if missing:
+        return jsonify({
+            "error": "데이터가 없는 종목이 있습니다",
+            "details": ', '.join(missing),
+            "code": "NO_DATA"
+        }), 404
+    
+    # 합친 거래일 달력으로 정렬 (각 종목은 자신의 거래일 기준 수익률)
+    returns = returns_matrix(closes).reindex(columns=tickers).fillna(0.0)
+    if len(returns) < 30:
+        return jsonify({
+            "error": "충분한 데이터가 없습니다",
+            "details": "포트폴리오 분석을 위해서는 30거래일 이상의 데이터가 필요합니다",
+            "code": "INSUFFICIENT_DATA"
+        }), 400
+    
+    metrics = calculate_portfolio_metrics(returns.to_numpy(dtype=np.float64), weights)
+    for ticker, position in zip(tickers, metrics['positions']):
+        position['ticker'] = ticker
+    
+    return jsonify({
+        "metadata": {
+            "tickers": tickers,
+            "period": data_range,
+            "interval": '1d',
+            "data_points": len(returns),
+            "start_date": returns.index[0].isoformat(),
+            "end_date": returns.index[-1].isoformat()
+        },
+        "risk_metrics": metrics
+    })
+
+
+# --- 사전 계산 배치 (장 마감 후 /api/stock 응답 생성) ---
+def render_stock_payload(ticker, data_range, interval, response_format='json'):
+    """응답 캐시/사전 계산 저장소를 거치지 않고 /api/stock 응답을 만듭니다."""
+    query = {'ticker': ticker, 'range': data_range, 'interval': interval, 'format': response_format}
+    with app.test_request_context('/api/stock', query_string=query):
+        return make_response(inspect.unwrap(get_stock_data)())
+
+def precompute_stock_payloads(ticker, ranges, interval='1d'):
+    """
+    종목의 기간별 응답을 미리 계산해 저장 (저장한 개수 반환)
+    유효 구간은 마지막 장 마감부터 다음 장 시작까지이며, 장중이면 건너뜁니다.
+    """
+    benchmark = select_benchmark(ticker)
+    session_close = last_session_close(benchmark)
+    session_open = next_session_open(benchmark, session_close)
+    if pd.Timestamp.now(tz=session_close.tz) >= session_open:
+        return 0
+    
+    written = 0
+    for data_range in ranges:
+        response = render_stock_payload(ticker, data_range, interval)
+        if response.status_code != 200:
+            continue
+        # 마지막 봉이 마감된 세션이 아니면 (공급자 반영 지연) 저장하지 않음
+        last_bar = pd.Timestamp(response.get_json()['timestamp'][-1], unit='s', tz='UTC').tz_convert(session_close.tz)
+        if last_bar.date() != session_close.date():
+            logging.info(f"Skipping precompute for {ticker} {data_range}: last bar {last_bar.date()} is not the closed session")
+            continue
+        payload_store.write(
+            ticker, data_range, interval, response.get_data(),
+            valid_from=session_close.timestamp(), valid_until=session_open.timestamp()
+        )
+        # 같은 분석 결과의 바이너리 형식 (지표 상태/바 저장소가 채워져 있어 추가 다운로드 없음)
+        binary = render_stock_payload(ticker, data_range, interval, 'binary')
+        if binary.status_code == 200:
+            payload_store.write(
+                ticker, data_range, interval, binary.get_data(),
+                valid_from=session_close.timestamp(), valid_until=session_open.timestamp(), variant='binary'
+            )
+        written += 1
+    return written
+
+@app.cli.command('precompute-payloads')
+@click.option('--universe', 'universes', multiple=True, type=click.Choice(UNIVERSES),
+              help='대상 종목군 (기본: PRECOMPUTE_UNIVERSES)')
+@click.option('--ticker', 'tickers', multiple=True, help='대상 티커 (지정하면 종목군 대신 사용)')
+@click.option('--range', 'ranges', multiple=True, help='대상 기간 (기본: PRECOMPUTE_RANGES)')
+@click.option('--workers', type=int, default=None, help='동시 처리 종목 수')
+def precompute_payloads_command(universes, tickers, ranges, workers):
+    """장 마감 후 일봉 /api/stock 응답 사전 계산 (예: flask --app server precompute-payloads --universe sp500)"""
+    if payload_store is None:
+        raise click.ClickException("PRECOMPUTED_ENABLED가 꺼져 있습니다")
+    symbols = [validate_ticker(t) for t in tickers] or [
+        row['symbol'] for row in load_universe(BASE_DIR, list(universes) or app.config['PRECOMPUTE_UNIVERSES'])
+    ]
+    ranges = list(ranges) or app.config['PRECOMPUTE_RANGES']
+    
+    def run(ticker):
+        try:
+            return precompute_stock_payloads(ticker, ranges)
+        except Exception as e:
+            logging.warning(f"Precompute failed for {ticker}: {e}")
+            return 0
+    
+    with ThreadPoolExecutor(max_workers=workers or app.config['PRECOMPUTE_WORKERS']) as pool:
+        written = sum(pool.map(run, symbols))
+    entries = payload_store.save_manifest()
+    click.echo(f"Precomputed {written} payloads for {len(symbols)} symbols ({entries} active entries)")
+    if indicator_states is not None:
+        pruned = indicator_states.prune(app.config['INDICATOR_STATE_MAX_AGE'])
+        click.echo(f"Removed {pruned} unused indicator state files")
+    # 방금 갱신한 일봉으로 섹터 집계 스냅샷도 다시 생성 (서버는 시작할 때 바로 불러옴)
+    save_sector_snapshot()
 
 
 # --- API 2: 기업 정보 (펀더멘탈 스탯) 및 계산 모델 ---
 @app.route('/api/stock/info')
 @limiter.limit("20 per minute")  # 기업 정보는 더 제한적
-@cache.memoize()
+@reject_unknown_tickers
+@cached_response('info')
 @handle_api_errors
 def get_stock_info():
     ticker = request.args.get('ticker')
     ticker = validate_ticker(ticker)
     
-    # yfinance 요청 시도 (재시도 로직 포함)
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            break
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise e
-            time.sleep(1)
+    # 펀더멘털 저장소 조회 (필드별 유지 시간이 지난 그룹만 공급자에게 요청)
+    try:
+        info, stats = fundamentals_store.get(ticker)
+    except Exception as e:
+        if is_not_found_error(e):
+            return ticker_not_found_response(ticker)
+        raise e
     
     # 기본 정보 확인
-    if not info or len(info) < 5:  # 너무 적은 정보는 무효한 티커로 간주
+    if info is None:
         return jsonify({
             "error": f"'{ticker}' 종목의 정보를 찾을 수 없습니다",
             "details": "종목 심볼을 확인해주세요",
             "code": "TICKER_NOT_FOUND"
         }), 404
     
+    # 섹터 집계 갱신 (S&P 500 구성 종목만)
+    if _sector_aggregates is not None:
+        _sector_aggregates.update_fundamentals(ticker, info.get('marketCap'), stats)
+    
     # PE 값 결정
     pe_value = info.get('trailingPE')
     pe_type = 'Trailing PE'
     if pe_value is None:
         pe_value = info.get('forwardPE')
         pe_type = 'Forward PE'
-
-    # 펀더멘탈 통계 계산
-    try:
-        stats = calculate_fundamental_stats(info)
-    except Exception as e:
-        logging.warning(f"Error calculating fundamental stats for {ticker}: {e}")
-        stats = {
-            "scores": {"value": 0, "growth": 0, "profitability": 0, "stability": 0},
-            "totalScore": 0,
-            "grade": "F (데이터 부족)"
-        }
     
     # 안전한 값 추출
     def safe_get(key, default=None):
@@ -1071,12 +2510,11 @@ def get_stock_info():
             "ticker": ticker,
             "currency": safe_get('currency'),
             "exchange": safe_get('exchange'),
-            "quoteType": safe_get('quoteType'),
-            "lastUpdated": time.time()
+            "quoteType": safe_get('quoteType')
         }
     }
     
-    return jsonify(response_data)
+    return fast_json_response(response_data)
 
 def calculate_fundamental_stats(info):
     scores = {'value': 0, 'growth': 0, 'profitability': 0, 'stability': 0}
@@ -1152,6 +2590,28 @@ def get_grade(score):
     if score >= 30: return "E (주의)"          # 주의
     return "F (위험)"                          # 위험
 
+def fundamental_stats_or_default(info):
+    """펀더멘털 통계 계산 (실패 시 기본값)"""
+    try:
+        return calculate_fundamental_stats(info)
+    except Exception as e:
+        logging.warning(f"Error calculating fundamental stats for {info.get('symbol')}: {e}")
+        return {
+            "scores": {"value": 0, "growth": 0, "profitability": 0, "stability": 0},
+            "totalScore": 0,
+            "grade": "F (데이터 부족)"
+        }
+
+
+# --- 펀더멘털 저장소 ---
+fundamentals_store = FundamentalsStore(
+    app.config['FUNDAMENTALS_STORE_DIR'],
+    ttls=app.config['FUNDAMENTALS_TTLS'],
+    fetch_info=lambda ticker: provider.call(lambda: yf.Ticker(ticker).info),
+    fetch_fast_info=lambda ticker: provider.call(lambda: yf.Ticker(ticker).fast_info),
+    stats_fn=fundamental_stats_or_default
+)
+
 
 # --- 앱 실행 ---
 if __name__ == '__main__':